@@ -0,0 +1,130 @@
+"""
+Vectorized sorted-unique for numeric data, shared by every challenge Solution.
+
+`Solution.process_data` returns the sorted unique items of its input. For a
+large list that is all ints or all floats (or a 1-D NumPy array), NumPy gives
+the same answer many times faster than a set plus sorted():
+
+- Integers whose span (max - min + 1) is small compared with the input are
+  deduped with a bitmap: one flag per possible value, O(n + span) and no
+  comparisons. dedup_crossover.py measures where that stops paying off.
+- Everything else is sorted, keeping each value that differs from its
+  left neighbour.
+
+Inputs whose result the generic path leaves ambiguous (NaN, or a mix of 0.0
+and -0.0) are refused, so the caller falls back to the generic path.
+"""
+
+try:
+    import numpy as np
+except ImportError:  # Callers then always use their generic path.
+    np = None
+
+# Below this many items, converting to an array costs more than it saves.
+NUMPY_MIN_SIZE = 1000
+# Integers spanning at most this many values per item are deduped with a
+# bitmap instead of a sort (measured by dedup_crossover.py: the bitmap wins up
+# to a span of about 2-4x the input size).
+BITMAP_SPAN_FACTOR = 2
+
+
+def as_numeric_array(data):
+    """
+    Returns `data` as a 1-D numeric array if it is homogeneously int or float
+    and has no values whose order process_data leaves ambiguous, else None.
+
+    Lists and tuples become int64 or float64 arrays; a 1-D int/uint/float
+    ndarray is returned as it is.
+    """
+    if np is None:
+        return None
+    if isinstance(data, np.ndarray):
+        if data.ndim != 1 or data.dtype.kind not in 'iuf':
+            return None
+        values = data
+    elif isinstance(data, (list, tuple)):
+        item_types = set(map(type, data))
+        if item_types == {int}:
+            dtype = np.int64
+        elif item_types == {float}:
+            dtype = np.float64
+        else:
+            return None  # Mixed, non-numeric (bool is not int here) or unhashable items.
+        try:
+            values = np.fromiter(data, dtype=dtype, count=len(data))
+        except OverflowError:  # Ints that do not fit in 64 bits.
+            return None
+    else:
+        return None
+    if values.dtype.kind == 'f':
+        # sorted() leaves NaNs wherever comparisons happen to put them, and a
+        # set keeps whichever of 0.0/-0.0 came first; neither is reproducible here.
+        if np.isnan(values).any():
+            return None
+        zero_signs = np.signbit(values[values == 0])
+        if zero_signs.any() and not zero_signs.all():
+            return None
+    return values
+
+
+def unique_sorted(values):
+    """
+    Returns the sorted unique values of a 1-D array by sorting it.
+    """
+    # This is numpy.unique's classic sort-then-compare-neighbours algorithm.
+    # Spelled out because NumPy 2.3+ runs np.unique on integers through a
+    # hash table first, which is several times slower on large arrays.
+    ordered = np.sort(values)
+    keep = np.empty(len(ordered), dtype=bool)
+    keep[:1] = True
+    np.not_equal(ordered[1:], ordered[:-1], out=keep[1:])
+    return ordered[keep]
+
+
+def unique_bitmap(values, low, span):
+    """
+    Returns the sorted unique values of a 1-D integer array whose values all
+    lie in [low, low + span).
+    """
+    # One flag per possible value: mark what occurs, then read the flags
+    # in order. O(n + span) with no comparisons, and already sorted.
+    # Offsets are computed in the array's own dtype. They may wrap around
+    # (int8: 100 - -100), but reading the bits as unsigned recovers the
+    # true offset, and the way back wraps into the right value too.
+    low = values.dtype.type(low)
+    present = np.zeros(span, dtype=bool)
+    present[(values - low).view(f'u{values.itemsize}')] = True
+    return np.flatnonzero(present).astype(values.dtype) + low
+
+
+def unique_array(values, bitmap_span_factor=BITMAP_SPAN_FACTOR):
+    """
+    Returns the sorted unique values of a 1-D numeric array, choosing the
+    bitmap or the sort.
+    """
+    if values.dtype.kind in 'iu' and len(values):
+        # For integers, min/max cost one cheap pass and tell us if a bitmap fits.
+        low = int(values.min())
+        span = int(values.max()) - low + 1
+        if span <= bitmap_span_factor * len(values):
+            return unique_bitmap(values, low, span)
+    return unique_sorted(values)
+
+
+def process_numeric(data, min_size=NUMPY_MIN_SIZE, bitmap_span_factor=BITMAP_SPAN_FACTOR):
+    """
+    Vectorized process_data for large inputs that are all ints or all floats.
+
+    Returns:
+        list: The sorted unique items, with the element types the generic
+        path would return; None if the input does not qualify, so the caller
+        runs its generic path.
+    """
+    if np is None or not isinstance(data, (list, tuple, np.ndarray)) or len(data) < min_size:
+        return None
+    values = as_numeric_array(data)
+    if values is None:
+        return None
+    unique = unique_array(values, bitmap_span_factor)
+    # Match the element types the generic path would return.
+    return list(unique) if isinstance(data, np.ndarray) else unique.tolist()
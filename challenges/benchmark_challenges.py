@@ -0,0 +1,232 @@
+"""
+Benchmark every dated challenge solution, re-running only what changed.
+
+A new `challenge_YYYY_MM_DD_*.py` file appears for each day. This runner:
+
+1. Discovers every challenge file in this directory.
+2. Imports each one under a private module name, so its
+   `if __name__ == "__main__":` block does not run.
+3. Times `process_data` and `validate_input` on standard inputs (several
+   sizes and kinds of data), with warm-up calls first and the best and median
+   of several repetitions, and checks process_data's answer.
+4. Stores the results under the SHA-256 of the file's content plus the
+   benchmark settings. A file that has not changed since the last run is
+   never benchmarked again; its stored results are reported instead.
+
+Identical copies of a solution share a hash, so they are measured only once.
+"""
+
+import argparse
+import glob
+import hashlib
+import importlib.util
+import json
+import os
+import platform
+import random
+import statistics
+import sys
+import time
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+CHALLENGE_PATTERN = 'challenge_[0-9][0-9][0-9][0-9]_[0-9][0-9]_[0-9][0-9]_*.py'
+DEFAULT_CACHE = os.path.join(HERE, '.benchmark_results.json')
+DEFAULT_SIZES = (1_000, 10_000, 100_000, 1_000_000)
+INPUT_KINDS = ('ints', 'small_ints', 'floats', 'strings')
+
+
+def discover_challenges(directory=HERE, pattern=CHALLENGE_PATTERN):
+    """
+    Returns the paths of all challenge files in `directory`, oldest date first.
+    """
+    return sorted(glob.glob(os.path.join(directory, pattern)))
+
+
+def file_hash(path):
+    with open(path, 'rb') as challenge_file:
+        return hashlib.sha256(challenge_file.read()).hexdigest()
+
+
+def import_challenge(path):
+    """
+    Imports a challenge file without running its __main__ block.
+    """
+    name = 'challenge_bench_' + os.path.splitext(os.path.basename(path))[0]
+    spec = importlib.util.spec_from_file_location(name, path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def make_input(kind, size, seed=0):
+    """
+    Returns a reproducible input list of `size` items with about 50% duplicates.
+    """
+    rng = random.Random(f'{kind}-{size}-{seed}')
+    distinct = max(1, size // 2)
+    if kind == 'ints':
+        pool = [rng.randrange(-2**40, 2**40) for _ in range(distinct)]
+    elif kind == 'small_ints':
+        return [rng.randrange(distinct) for _ in range(size)]
+    elif kind == 'floats':
+        pool = [rng.uniform(-1e6, 1e6) for _ in range(distinct)]
+    elif kind == 'strings':
+        pool = [f'key-{rng.getrandbits(48):012x}' for _ in range(distinct)]
+    else:
+        raise ValueError(f"Unknown input kind: {kind}")
+    return [rng.choice(pool) for _ in range(size)]
+
+
+def reference_result(data):
+    """
+    What every process_data must return: the sorted unique values.
+    """
+    return sorted(set(data))
+
+
+def time_call(function, data, warmup, repeat):
+    """
+    Calls function(data) `warmup` times untimed, then `repeat` times timed.
+    Returns (best seconds, median seconds, last result).
+    """
+    result = None
+    for _ in range(warmup):
+        result = function(data)
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        result = function(data)
+        timings.append(time.perf_counter() - started)
+    return min(timings), statistics.median(timings), result
+
+
+def benchmark_solution(path, sizes, kinds, warmup, repeat, inputs=None):
+    """
+    Benchmarks one challenge file and returns its list of measurements.
+    """
+    solution = import_challenge(path).Solution()
+    inputs = {} if inputs is None else inputs
+    measurements = []
+    for kind in kinds:
+        for size in sizes:
+            key = (kind, size)
+            if key not in inputs:
+                inputs[key] = make_input(kind, size)
+            data = inputs[key]
+            # Fewer repetitions for big inputs keeps the whole run bounded.
+            runs = max(1, repeat // 3) if size >= 1_000_000 else repeat
+            entry = {'kind': kind, 'size': size}
+            try:
+                best, median, result = time_call(solution.process_data, data, warmup, runs)
+                entry.update(process_data_best_s=best, process_data_median_s=median,
+                             correct=result == reference_result(data))
+            except Exception as exc:
+                entry.update(process_data_error=repr(exc), correct=False)
+            try:
+                best, median, _ = time_call(solution.validate_input, data, warmup, runs)
+                entry.update(validate_input_best_s=best, validate_input_median_s=median)
+            except Exception as exc:
+                entry['validate_input_error'] = repr(exc)
+            measurements.append(entry)
+    return measurements
+
+
+def settings_key(sizes, kinds, warmup, repeat):
+    """
+    Identifies the benchmark settings and environment; results are only
+    reused when these match too.
+    """
+    try:
+        import numpy
+        numpy_version = numpy.__version__
+    except ImportError:
+        numpy_version = None
+    settings = {'sizes': list(sizes), 'kinds': list(kinds), 'warmup': warmup, 'repeat': repeat,
+                'python': platform.python_version(), 'numpy': numpy_version, 'machine': platform.machine()}
+    return hashlib.sha256(json.dumps(settings, sort_keys=True).encode('utf-8')).hexdigest()[:16]
+
+
+def load_cache(path):
+    if not os.path.exists(path):
+        return {}
+    with open(path, encoding='utf-8') as cache_file:
+        return json.load(cache_file)
+
+
+def save_cache(path, cache):
+    temporary = path + '.tmp'
+    with open(temporary, 'w', encoding='utf-8') as cache_file:
+        json.dump(cache, cache_file, indent=1, sort_keys=True)
+    os.replace(temporary, path)
+
+
+def run(paths, sizes=DEFAULT_SIZES, kinds=INPUT_KINDS, warmup=1, repeat=5, cache_path=DEFAULT_CACHE,
+        force=False):
+    """
+    Benchmarks every file in `paths` whose results are not cached yet.
+
+    Returns:
+        list: One {'file', 'hash', 'cached', 'measurements'} dict per file.
+    """
+    cache = load_cache(cache_path) if cache_path else {}
+    settings = settings_key(sizes, kinds, warmup, repeat)
+    inputs = {}  # Shared by every file, so each input is generated once.
+    reports = []
+    for path in paths:
+        digest = file_hash(path)
+        key = f'{digest}:{settings}'
+        cached = key in cache and not force
+        if not cached:
+            print(f"Benchmarking {os.path.basename(path)}...", file=sys.stderr)
+            cache[key] = {'measurements': benchmark_solution(path, sizes, kinds, warmup, repeat, inputs),
+                          'measured_at': time.strftime('%Y-%m-%dT%H:%M:%S'),
+                          'first_file': os.path.basename(path)}
+            if cache_path:
+                save_cache(cache_path, cache)  # Save as we go, so an interrupted run keeps its progress.
+        reports.append({'file': os.path.basename(path), 'hash': digest[:12], 'cached': cached,
+                        'measurements': cache[key]['measurements']})
+    return reports
+
+
+def print_reports(reports):
+    for report in reports:
+        source = 'cached' if report['cached'] else 'measured'
+        print(f"\n{report['file']}  (sha256 {report['hash']}, {source})")
+        print(f"  {'input':<12}{'size':>10}{'process_data':>15}{'validate_input':>16}  ok")
+        for entry in report['measurements']:
+            process = (f"{entry['process_data_best_s'] * 1000:.2f}ms" if 'process_data_best_s' in entry
+                       else 'error')
+            validate = (f"{entry['validate_input_best_s'] * 1e6:.1f}us" if 'validate_input_best_s' in entry
+                        else 'error')
+            print(f"  {entry['kind']:<12}{entry['size']:>10,}{process:>15}{validate:>16}  "
+                  f"{'yes' if entry['correct'] else 'NO'}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark every challenge solution (cached by file content).")
+    parser.add_argument('files', nargs='*', help="Challenge files (default: discover all in this directory).")
+    parser.add_argument('--sizes', type=int, nargs='*', default=list(DEFAULT_SIZES))
+    parser.add_argument('--kinds', nargs='*', choices=INPUT_KINDS, default=list(INPUT_KINDS))
+    parser.add_argument('--warmup', type=int, default=1)
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--cache', default=DEFAULT_CACHE, help="Results file ('' to disable caching).")
+    parser.add_argument('--force', action='store_true', help="Re-benchmark even unchanged files.")
+    parser.add_argument('--json', help="Also write this run's results to a JSON file.")
+    args = parser.parse_args()
+
+    paths = args.files or discover_challenges()
+    reports = run(paths, args.sizes, args.kinds, args.warmup, args.repeat, args.cache or None, args.force)
+    print_reports(reports)
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as output_file:
+            json.dump(reports, output_file, indent=2)
+
+
+if __name__ == "__main__":
+    main()
+
+# --- Example Usage ---
+#
+#   python challenges/benchmark_challenges.py                    # Everything new or changed.
+#   python challenges/benchmark_challenges.py --sizes 1000 100000 --kinds ints strings
+#   python challenges/benchmark_challenges.py --force challenges/challenge_2026_02_11_*.py
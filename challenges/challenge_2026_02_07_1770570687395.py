@@ -1,3 +1,6 @@
+from _numeric_dedup import process_numeric
+
+
 class Solution:
     """
     Daily coding challenge solution.
@@ -5,6 +8,9 @@ class Solution:
     Date: 2026-02-07
     """
     def process_data(self, data: list) -> list:
+        fast_result = process_numeric(data)
+        if fast_result is not None:
+            return fast_result
         result = []
         seen = set()
         for item in data:
@@ -0,0 +1,106 @@
+"""
+Benchmark: where does the bitmap dedup in Solution.process_data pay off?
+
+For integer inputs, process_data (through _numeric_dedup.process_numeric,
+shared by every challenge file) picks between three strategies:
+
+- set + sorted(): the original generic path, per-item interpreter work.
+- NumPy sort: sort the array, keep values that differ from their neighbour.
+- Bitmap: one flag per possible value between min and max. The cost is
+  O(n + span), so it wins while the span is small compared with n.
+
+This script times all three on random integers for several input sizes and
+spans ("span factor" = span / n), and prints where the bitmap stops beating
+the sort. That crossover is what _numeric_dedup.BITMAP_SPAN_FACTOR is based on.
+"""
+
+import argparse
+import time
+
+import numpy as np
+
+import _numeric_dedup as numeric_dedup
+
+
+def set_sorted(data):
+    """
+    The original process_data algorithm, as the baseline.
+    """
+    result = []
+    seen = set()
+    for item in data:
+        if item not in seen:
+            seen.add(item)
+            result.append(item)
+    return sorted(result)
+
+
+def best_time(function, *args, repeats=3):
+    best = float('inf')
+    for _ in range(repeats):
+        started = time.perf_counter()
+        function(*args)
+        best = min(best, time.perf_counter() - started)
+    return best
+
+
+def run(sizes, span_factors, seed=0):
+    """
+    Returns one row per (size, span factor) with the time of every strategy.
+    """
+    rng = np.random.default_rng(seed)
+    rows = []
+    for size in sizes:
+        for factor in span_factors:
+            span = max(1, int(size * factor))
+            values = rng.integers(0, span, size)
+            as_list = values.tolist()
+            low = int(values.min())
+            actual_span = int(values.max()) - low + 1
+            rows.append({
+                'size': size,
+                'span_factor': factor,
+                'set_sorted_s': best_time(set_sorted, as_list),
+                'numpy_sort_s': best_time(numeric_dedup.unique_sorted, values),
+                'bitmap_s': best_time(numeric_dedup.unique_bitmap, values, low, actual_span),
+                'process_data_s': best_time(numeric_dedup.process_numeric, as_list),
+            })
+    return rows
+
+
+def crossovers(rows):
+    """
+    Returns {size: largest span factor at which the bitmap still beat the sort}.
+    """
+    result = {}
+    for row in rows:
+        if row['bitmap_s'] < row['numpy_sort_s']:
+            result[row['size']] = max(result.get(row['size'], 0), row['span_factor'])
+        else:
+            result.setdefault(row['size'], None)
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Find the bitmap/sort crossover for process_data.")
+    parser.add_argument('--sizes', type=int, nargs='*', default=[10_000, 100_000, 1_000_000])
+    parser.add_argument('--span-factors', type=float, nargs='*', default=[0.1, 0.5, 1, 2, 4, 8, 16, 64])
+    args = parser.parse_args()
+
+    rows = run(args.sizes, args.span_factors)
+    print(f"{'n':>10}{'span/n':>8}{'set+sorted':>12}{'np.sort':>10}{'bitmap':>10}{'process_data':>14}")
+    for row in rows:
+        print(f"{row['size']:>10,}{row['span_factor']:>8}{row['set_sorted_s'] * 1000:>10.1f}ms"
+              f"{row['numpy_sort_s'] * 1000:>8.1f}ms{row['bitmap_s'] * 1000:>8.1f}ms"
+              f"{row['process_data_s'] * 1000:>12.1f}ms")
+    print("\nBitmap beats the sort up to span/n of:")
+    for size, factor in crossovers(rows).items():
+        print(f"  n={size:,}: {factor if factor is not None else 'never'}")
+
+
+if __name__ == "__main__":
+    main()
+
+# --- Example Usage ---
+#
+#   python challenges/dedup_crossover.py --sizes 100000 10000000 --span-factors 1 2 4 8
@@ -0,0 +1,220 @@
+"""
+Sorted, de-duplicated output for inputs that do not fit in memory.
+
+`Solution.process_data` holds the input list, a `seen` set and a `result`
+list at the same time, about three times the size of the data. This module
+does the same job in streaming form (an "external merge sort"):
+
+1. Read the input in chunks sized to the memory budget. Sort and dedup each
+   chunk in memory and write it to a temporary "run" file.
+2. Merge all runs with a heap (k-way merge). Because every run is sorted,
+   equal values come out next to each other, so duplicates *across* runs are
+   dropped by comparing each value with the previous one.
+3. Yield the result lazily; it is never held in memory as a whole.
+
+With too many runs to merge at once (each open run needs a read buffer), runs
+are merged in groups into bigger runs first ("multi-pass merge").
+"""
+
+import argparse
+import heapq
+import itertools
+import os
+import pickle
+import sys
+import tempfile
+
+DEFAULT_MEMORY_BUDGET = 64 * 2**20
+DEFAULT_FAN_IN = 64
+# Items written per pickle record in a run file (and read back at once).
+MAX_BLOCK_ITEMS = 4096
+# Rough per-item overhead on top of the object itself: the list slot, and the
+# dict entry used to dedup the chunk.
+ITEM_OVERHEAD_BYTES = 8 + 50
+
+
+def estimate_item_bytes(sample):
+    """
+    Returns the average in-memory cost of one item, judging by `sample`.
+    """
+    if not sample:
+        return ITEM_OVERHEAD_BYTES
+    return sum(map(sys.getsizeof, sample)) / len(sample) + ITEM_OVERHEAD_BYTES
+
+
+def _write_run(directory, values, block_items):
+    """
+    Writes the sorted iterable `values` to a new run file in blocks and
+    returns (path, number of values written).
+    """
+    handle, path = tempfile.mkstemp(suffix='.run', dir=directory)
+    count = 0
+    iterator = iter(values)
+    with os.fdopen(handle, 'wb') as run_file:
+        while True:
+            block = list(itertools.islice(iterator, block_items))
+            if not block:
+                break
+            pickle.dump(block, run_file, protocol=pickle.HIGHEST_PROTOCOL)
+            count += len(block)
+    return path, count
+
+
+def _read_run(path):
+    """
+    Yields the values of a run file, one block in memory at a time.
+    """
+    with open(path, 'rb') as run_file:
+        while True:
+            try:
+                block = pickle.load(run_file)
+            except EOFError:
+                return
+            yield from block
+
+
+def _unique_sorted(sorted_values):
+    """
+    Drops consecutive duplicates from an already sorted iterable.
+    """
+    previous = missing = object()
+    for value in sorted_values:
+        if previous is missing or value != previous:
+            previous = value
+            yield value
+
+
+def _merge_runs(paths):
+    # heapq.merge breaks ties by argument order, so for equal values the one
+    # from the earlier run (the earlier occurrence in the input) wins.
+    return _unique_sorted(heapq.merge(*map(_read_run, paths)))
+
+
+class ExternalSortedUnique:
+    """
+    Sorts and dedups an iterable within a memory budget, spilling to disk.
+
+        sorter = ExternalSortedUnique(memory_budget=256 * 2**20)
+        for value in sorter.iter(read_values('huge.txt')):
+            ...
+        print(sorter.stats)
+
+    Values must be picklable and mutually comparable, the same requirement
+    `sorted()` has. Equal values keep the first occurrence, like process_data.
+    The budget is an estimate based on Python object sizes, not a hard limit:
+    while a chunk is being sorted, peak use can reach about twice the budget.
+    """
+
+    def __init__(self, memory_budget=DEFAULT_MEMORY_BUDGET, temp_dir=None, fan_in=DEFAULT_FAN_IN):
+        if fan_in < 2:
+            raise ValueError("fan_in must be at least 2")
+        self.memory_budget = memory_budget
+        self.temp_dir = temp_dir
+        self.fan_in = fan_in
+        self.stats = {}
+
+    def _chunks(self, iterator):
+        """
+        Yields lists of items whose estimated footprint fits the memory budget.
+        """
+        while True:
+            chunk = list(itertools.islice(iterator, 1024))
+            if not chunk:
+                return
+            capacity = max(len(chunk), int(self.memory_budget / estimate_item_bytes(chunk)))
+            chunk.extend(itertools.islice(iterator, capacity - len(chunk)))
+            yield chunk
+
+    def _block_items(self):
+        # During a merge every open run buffers one block; keep them all within budget.
+        per_run = self.memory_budget / ((self.fan_in + 1) * ITEM_OVERHEAD_BYTES * 2)
+        return int(max(64, min(MAX_BLOCK_ITEMS, per_run)))
+
+    def iter(self, items):
+        """
+        Yields the sorted unique values of `items`, lazily.
+        """
+        self.stats = {'input_items': 0, 'runs': 0, 'spilled_items': 0, 'merge_passes': 0, 'output_items': 0}
+        block_items = self._block_items()
+        with tempfile.TemporaryDirectory(prefix='dedup-', dir=self.temp_dir) as directory:
+            runs = []
+            pending = None  # The first chunk, kept in memory in case it is the only one.
+            for chunk in self._chunks(iter(items)):
+                self.stats['input_items'] += len(chunk)
+                # dict.fromkeys dedups while keeping the first occurrence of each value.
+                chunk = sorted(dict.fromkeys(chunk))
+                self.stats['runs'] += 1
+                if pending is None and not runs:
+                    pending = chunk
+                    continue
+                for values in (pending, chunk):
+                    if values is not None:
+                        path, count = _write_run(directory, values, block_items)
+                        runs.append(path)
+                        self.stats['spilled_items'] += count
+                pending = chunk = None
+
+            if not runs:
+                # Everything fit in one chunk: no disk I/O at all.
+                self.stats['output_items'] = len(pending or ())
+                yield from pending or ()
+                return
+
+            while len(runs) > self.fan_in:
+                self.stats['merge_passes'] += 1
+                merged = []
+                for start in range(0, len(runs), self.fan_in):
+                    group = runs[start:start + self.fan_in]
+                    merged.append(_write_run(directory, _merge_runs(group), block_items)[0])
+                    for path in group:
+                        os.remove(path)
+                runs = merged
+
+            self.stats['merge_passes'] += 1
+            for value in _merge_runs(runs):
+                self.stats['output_items'] += 1
+                yield value
+
+
+def process_data_external(data, memory_budget=DEFAULT_MEMORY_BUDGET, temp_dir=None):
+    """
+    Streaming counterpart of Solution.process_data: yields the same values
+    (sorted, duplicates removed) from any iterable, within `memory_budget` bytes.
+    """
+    return ExternalSortedUnique(memory_budget, temp_dir).iter(data)
+
+
+def read_values(path, parse=int):
+    """
+    Yields one parsed value per non-empty line of a text file.
+    """
+    with open(path, encoding='utf-8') as input_file:
+        for line in input_file:
+            line = line.strip()
+            if line:
+                yield parse(line)
+
+
+PARSERS = {'int': int, 'float': float, 'str': str}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Sort and dedup a file of values (one per line) of any size.")
+    parser.add_argument('input', help="Input file, one value per line.")
+    parser.add_argument('output', help="Output file for the sorted unique values.")
+    parser.add_argument('--type', choices=sorted(PARSERS), default='int', help="How to parse each line.")
+    parser.add_argument('--memory-mb', type=float, default=DEFAULT_MEMORY_BUDGET / 2**20)
+    parser.add_argument('--fan-in', type=int, default=DEFAULT_FAN_IN, help="Runs merged at once.")
+    parser.add_argument('--temp-dir', help="Where to put run files (default: the system temp dir).")
+    args = parser.parse_args()
+
+    sorter = ExternalSortedUnique(int(args.memory_mb * 2**20), args.temp_dir, args.fan_in)
+    with open(args.output, 'w', encoding='utf-8') as output_file:
+        for value in sorter.iter(read_values(args.input, PARSERS[args.type])):
+            output_file.write(f"{value}\n")
+    print(f"Wrote {sorter.stats['output_items']:,} unique values from {sorter.stats['input_items']:,} "
+          f"({sorter.stats['runs']} runs, {sorter.stats['merge_passes']} merge passes).")
+
+
+if __name__ == "__main__":
+    main()
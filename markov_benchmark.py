@@ -0,0 +1,325 @@
+# Learning Objective: Measure how the Markov chain from `python_guide_926be1.py`
+# behaves as the training corpus grows, and keep the numbers for later comparison.
+#
+# You will learn to:
+# 1. Synthesize realistic-looking corpora with a Zipfian word distribution.
+# 2. Time code with time.perf_counter and measure memory two ways:
+#    tracemalloc (Python allocations) and RSS (what the OS sees).
+# 3. Isolate each measurement in a fresh process so one case can't skew the next.
+# 4. Write results as JSON so future runs can be compared against a baseline.
+
+import argparse
+import json
+import multiprocessing
+import os
+import platform
+import random
+import sys
+import tempfile
+import time
+import tracemalloc
+from itertools import accumulate
+from queue import Empty
+
+try:
+    import resource
+except ImportError:  # Not available on Windows; RSS is then reported as None.
+    resource = None
+
+from python_guide_926be1 import build_markov_chain, generate_text
+
+# --- Part 1: Synthesizing a Corpus ---
+# Real text follows Zipf's law: the k-th most common word appears roughly
+# 1/k^s times as often as the most common one. A uniform random vocabulary
+# would give an unrealistically "flat" chain, so we sample with Zipf weights.
+
+SIZE_UNITS = {"KB": 1 << 10, "MB": 1 << 20, "GB": 1 << 30}
+
+
+def parse_size(text: str) -> int:
+    """
+    Converts sizes like "1MB", "250KB" or "1GB" (or a plain byte count) to bytes.
+    """
+    text = text.strip().upper()
+    for unit, factor in SIZE_UNITS.items():
+        if text.endswith(unit):
+            return int(float(text[: -len(unit)]) * factor)
+    return int(text)
+
+
+def make_vocabulary(vocab_size: int) -> list:
+    """
+    Returns `vocab_size` distinct lowercase pseudo-words ("a", "b", ..., "ba", ...).
+    Shorter words come first, so the most frequent words are also the shortest,
+    just like in natural language.
+    """
+    letters = "abcdefghijklmnopqrstuvwxyz"
+    vocab = []
+    n = 0
+    while len(vocab) < vocab_size:
+        word, value = "", n
+        while True:
+            word = letters[value % 26] + word
+            value //= 26
+            if value == 0:
+                break
+        vocab.append(word)
+        n += 1
+    return vocab
+
+
+def write_zipf_corpus(path: str, size_bytes: int, vocab_size: int = 50000,
+                      zipf_s: float = 1.1, seed: int = 0) -> None:
+    """
+    Writes a corpus of roughly `size_bytes` bytes to `path`, in chunks, so even
+    a 1 GB corpus is never held in memory at once.
+    """
+    rng = random.Random(seed)
+    vocab = make_vocabulary(vocab_size)
+    cum_weights = list(accumulate(1.0 / (rank ** zipf_s) for rank in range(1, vocab_size + 1)))
+
+    written = 0
+    with open(path, "w", encoding="ascii") as corpus_file:
+        while written < size_bytes:
+            chunk = " ".join(rng.choices(vocab, cum_weights=cum_weights, k=65536)) + "\n"
+            if written + len(chunk) > size_bytes:
+                chunk = chunk[: max(0, size_bytes - written)]
+            corpus_file.write(chunk)
+            written += len(chunk)
+
+
+def corpus_path_for(cache_dir: str, size_bytes: int, vocab_size: int, zipf_s: float, seed: int) -> str:
+    """
+    Returns the path of the cached corpus for these parameters, creating it if needed.
+    Corpora are deterministic in their parameters, so they are reused across runs.
+    """
+    os.makedirs(cache_dir, exist_ok=True)
+    name = f"zipf_{size_bytes}_v{vocab_size}_s{zipf_s}_seed{seed}.txt"
+    path = os.path.join(cache_dir, name)
+    if not os.path.exists(path):
+        print(f"Synthesizing {size_bytes / (1 << 20):.1f} MB corpus -> {path}")
+        tmp_path = path + ".partial"
+        write_zipf_corpus(tmp_path, size_bytes, vocab_size, zipf_s, seed)
+        os.replace(tmp_path, path)
+    return path
+
+
+# --- Part 2: Measuring Memory ---
+
+def peak_rss_bytes():
+    """
+    Returns the peak resident set size of this process in bytes, or None.
+    (ru_maxrss is in kilobytes on Linux but in bytes on macOS.)
+    """
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak if sys.platform == "darwin" else peak * 1024
+
+
+def estimate_model_bytes(markov_chain: dict) -> int:
+    """
+    Estimates the memory held by the chain: the dict itself, every key tuple and
+    successor list, and each distinct word string counted once.
+    """
+    total = sys.getsizeof(markov_chain)
+    seen_words = set()
+    for state, successors in markov_chain.items():
+        total += sys.getsizeof(state) + sys.getsizeof(successors)
+        for word in state:
+            if id(word) not in seen_words:
+                seen_words.add(id(word))
+                total += sys.getsizeof(word)
+        for word in successors:
+            if id(word) not in seen_words:
+                seen_words.add(id(word))
+                total += sys.getsizeof(word)
+    return total
+
+
+# --- Part 3: Running One Case ---
+
+def run_case(corpus_path: str, order: int, generate_words: int, use_tracemalloc: bool, seed: int) -> dict:
+    """
+    Builds a chain of the given order from the corpus and measures it.
+
+    The build is timed without tracemalloc (which slows allocation-heavy code
+    considerably); when `use_tracemalloc` is set, a second build is traced to
+    get the peak Python-level allocation.
+    """
+    with open(corpus_path, "r", encoding="ascii") as corpus_file:
+        text = corpus_file.read()
+    rss_before_build = peak_rss_bytes()
+
+    started = time.perf_counter()
+    chain = build_markov_chain(text, order=order)
+    build_s = time.perf_counter() - started
+    peak_rss = peak_rss_bytes()
+
+    corpus_words = sum(len(successors) for successors in chain.values()) + order
+    result = {
+        "corpus_bytes": len(text),
+        "corpus_words": corpus_words,
+        "order": order,
+        "build_s": round(build_s, 4),
+        "build_words_per_s": round(corpus_words / build_s, 1) if build_s > 0 else None,
+        "states": len(chain),
+        "transitions": corpus_words - order,
+        "model_bytes_estimate": estimate_model_bytes(chain),
+        "peak_rss_bytes": peak_rss,
+        "rss_growth_bytes": (peak_rss - rss_before_build) if peak_rss is not None else None,
+    }
+
+    # Generation: dead ends end a call early, so keep calling until we have
+    # enough words. The list of states is built once, outside the timing, and
+    # each call gets its start state from it (as the socket server does);
+    # otherwise generate_text rebuilds list(keys) on every call.
+    rng = random.Random(seed)
+    states = list(chain.keys())
+    produced = 0
+    started = time.perf_counter()
+    while produced < generate_words:
+        produced += len(generate_text(chain, length=generate_words - produced + order, order=order,
+                                      rng=rng, start_state=rng.choice(states), verbose=False).split())
+    generate_s = time.perf_counter() - started
+    result["generated_words"] = produced
+    result["generate_words_per_s"] = round(produced / generate_s, 1) if generate_s > 0 else None
+
+    if use_tracemalloc:
+        del chain
+        tracemalloc.start()
+        chain = build_markov_chain(text, order=order)
+        current, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        result["tracemalloc_model_bytes"] = current
+        result["tracemalloc_peak_bytes"] = peak
+    return result
+
+
+def _case_worker(queue, *args) -> None:
+    try:
+        queue.put(run_case(*args))
+    except MemoryError:
+        queue.put({"error": "MemoryError"})
+
+
+def run_case_isolated(*args) -> dict:
+    """
+    Runs `run_case` in a freshly spawned process so that peak RSS reflects
+    this case alone, not everything the benchmark did before it.
+    """
+    context = multiprocessing.get_context("spawn")
+    queue = context.Queue()
+    process = context.Process(target=_case_worker, args=(queue, *args))
+    process.start()
+    result = None
+    while result is None:
+        try:
+            result = queue.get(timeout=1.0)
+        except Empty:
+            # A child killed by the OOM killer never reports back.
+            if not process.is_alive():
+                result = {"error": f"worker exited with code {process.exitcode}"}
+    process.join()
+    return result
+
+
+# --- Part 4: The Benchmark Suite ---
+
+def run_suite(sizes: list, orders: list, generate_words: int = 100000, vocab_size: int = 50000,
+              zipf_s: float = 1.1, seed: int = 0, cache_dir: str = None,
+              use_tracemalloc: bool = True) -> dict:
+    """
+    Runs every (corpus size, order) combination and returns a JSON-ready report.
+    """
+    if cache_dir is None:
+        cache_dir = os.path.join(tempfile.gettempdir(), "markov_bench_corpora")
+
+    report = {
+        "meta": {
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "vocab_size": vocab_size,
+            "zipf_s": zipf_s,
+            "seed": seed,
+            "generate_words": generate_words,
+        },
+        "results": [],
+    }
+    for size_bytes in sizes:
+        path = corpus_path_for(cache_dir, size_bytes, vocab_size, zipf_s, seed)
+        for order in orders:
+            print(f"Benchmarking {size_bytes / (1 << 20):.1f} MB, order {order}...")
+            result = run_case_isolated(path, order, generate_words, use_tracemalloc, seed)
+            result.setdefault("corpus_bytes", size_bytes)
+            result.setdefault("order", order)
+            report["results"].append(result)
+            print("  " + json.dumps(result))
+    return report
+
+
+def compare_to_baseline(report: dict, baseline: dict) -> None:
+    """
+    Prints the relative change in build time and generation speed per case.
+    """
+    previous = {(r["corpus_bytes"], r["order"]): r for r in baseline.get("results", []) if "error" not in r}
+    print("\n--- Comparison with baseline ---")
+    for result in report["results"]:
+        key = (result.get("corpus_bytes"), result.get("order"))
+        if "error" in result or key not in previous:
+            continue
+        old = previous[key]
+        build_change = (result["build_s"] / old["build_s"] - 1) * 100 if old["build_s"] else 0.0
+        gen_change = ((result["generate_words_per_s"] / old["generate_words_per_s"] - 1) * 100
+                      if old.get("generate_words_per_s") else 0.0)
+        print(f"  {key[0] / (1 << 20):8.1f} MB order {key[1]}: "
+              f"build time {build_change:+.1f}%, generate speed {gen_change:+.1f}%")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark build_markov_chain and generate_text.")
+    parser.add_argument("--sizes", default="1MB,10MB,100MB",
+                        help="Comma-separated corpus sizes, e.g. 1MB,10MB,100MB,1GB.")
+    parser.add_argument("--orders", default="1,2,3,4", help="Comma-separated chain orders.")
+    parser.add_argument("--generate-words", type=int, default=100000)
+    parser.add_argument("--vocab-size", type=int, default=50000)
+    parser.add_argument("--zipf-s", type=float, default=1.1)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--cache-dir", help="Where synthesized corpora are kept between runs.")
+    parser.add_argument("--no-tracemalloc", action="store_true",
+                        help="Skip the traced rebuild (halves the run time on large corpora).")
+    parser.add_argument("--output", default="markov_bench.json", help="Where to write the JSON report.")
+    parser.add_argument("--baseline", help="A previous JSON report to compare against.")
+    args = parser.parse_args()
+
+    report = run_suite(
+        sizes=[parse_size(size) for size in args.sizes.split(",")],
+        orders=[int(order) for order in args.orders.split(",")],
+        generate_words=args.generate_words,
+        vocab_size=args.vocab_size,
+        zipf_s=args.zipf_s,
+        seed=args.seed,
+        cache_dir=args.cache_dir,
+        use_tracemalloc=not args.no_tracemalloc,
+    )
+    with open(args.output, "w", encoding="utf-8") as output_file:
+        json.dump(report, output_file, indent=2)
+    print(f"\nWrote {len(report['results'])} results to {args.output}")
+
+    if args.baseline:
+        with open(args.baseline, "r", encoding="utf-8") as baseline_file:
+            compare_to_baseline(report, json.load(baseline_file))
+
+
+if __name__ == "__main__":
+    main()
+
+# --- Example Usage ---
+#
+#   python markov_benchmark.py                                  # 1 MB - 100 MB, orders 1-4
+#   python markov_benchmark.py --sizes 1MB,10MB,100MB,1GB --no-tracemalloc
+#   python markov_benchmark.py --output today.json --baseline yesterday.json
+#
+# Keep in mind that a pure-Python chain over a 1 GB corpus needs many GB of RAM;
+# cases that run out of memory are recorded as {"error": "MemoryError"}.
@@ -0,0 +1,425 @@
+# Learning Objective: Serve a trained Markov chain to many clients at once
+# using asyncio and a Unix domain socket.
+#
+# `python_guide_926be1.py` shows how to build a Markov chain and generate text
+# from it. Every program that imports it, however, has to rebuild (or reload)
+# its own chain. Here we load the chain ONCE in a small server process and let
+# any number of local clients ask it for text over a Unix domain socket.
+#
+# You will learn to:
+# 1. Frame messages on a byte stream with a simple length-prefixed protocol.
+# 2. Coalesce concurrent requests into batches with an asyncio.Queue.
+# 3. Keep CPU work off the event loop with run_in_executor.
+# 4. Track latency (p50/p99) and throughput counters.
+# 5. Drive the server with a bundled client and load generator.
+
+import argparse
+import asyncio
+import json
+import os
+import random
+import struct
+import time
+from collections import deque
+
+from python_guide_926be1 import build_markov_chain, generate_text
+
+# --- Part 1: The Wire Protocol ---
+# A socket is a stream of bytes with no notion of "messages", so we frame each
+# message ourselves: a 4-byte big-endian unsigned length followed by that many
+# bytes of UTF-8 JSON.
+#
+#   request:  {"op": "generate", "length": 30, "seed": 7}   (seed is optional, length <= MAX_LENGTH)
+#             {"op": "stats"}
+#   response: {"ok": true, "text": "..."}  or  {"ok": false, "error": "..."}
+
+HEADER = struct.Struct(">I")
+MAX_MESSAGE_BYTES = 1 << 20  # Refuse absurd frames instead of allocating them.
+MAX_LENGTH = 10_000  # Words per request; one huge request would stall the shared batcher.
+DEFAULT_SOCKET_PATH = "/tmp/markov.sock"
+
+
+async def read_message(reader: asyncio.StreamReader) -> dict:
+    """
+    Reads one length-prefixed JSON message from the stream.
+
+    Raises:
+        asyncio.IncompleteReadError: If the peer closed the connection.
+        ValueError: If the frame is larger than MAX_MESSAGE_BYTES.
+    """
+    header = await reader.readexactly(HEADER.size)
+    (size,) = HEADER.unpack(header)
+    if size > MAX_MESSAGE_BYTES:
+        raise ValueError(f"Message of {size} bytes exceeds the {MAX_MESSAGE_BYTES} byte limit.")
+    payload = await reader.readexactly(size)
+    return json.loads(payload.decode("utf-8"))
+
+
+def write_message(writer: asyncio.StreamWriter, message: dict) -> None:
+    """
+    Queues one length-prefixed JSON message on the stream (call `drain()` after).
+    """
+    payload = json.dumps(message).encode("utf-8")
+    writer.write(HEADER.pack(len(payload)) + payload)
+
+
+# --- Part 2: Latency and Throughput Counters ---
+
+def percentile(samples, pct: float) -> float:
+    """
+    Returns the nearest-rank percentile of `samples` (0.0 if there are none).
+    """
+    if not samples:
+        return 0.0
+    ordered = sorted(samples)
+    rank = max(1, int(round(pct / 100.0 * len(ordered))))
+    return ordered[min(rank, len(ordered)) - 1]
+
+
+class ServerStats:
+    """
+    Counters describing what the server has done since it started.
+
+    Latencies are kept in a bounded window so a long-running server
+    does not grow without limit; percentiles describe recent traffic.
+    """
+
+    def __init__(self, window: int = 10000):
+        self.started_at = time.perf_counter()
+        self.requests = 0
+        self.errors = 0
+        self.batches = 0
+        self.batched_requests = 0
+        self.words_generated = 0
+        self.latencies_ms = deque(maxlen=window)
+
+    def record_batch(self, size: int) -> None:
+        self.batches += 1
+        self.batched_requests += size
+
+    def record_request(self, latency_ms: float, words: int) -> None:
+        self.requests += 1
+        self.words_generated += words
+        self.latencies_ms.append(latency_ms)
+
+    def snapshot(self) -> dict:
+        uptime = time.perf_counter() - self.started_at
+        return {
+            "uptime_s": round(uptime, 3),
+            "requests": self.requests,
+            "errors": self.errors,
+            "batches": self.batches,
+            "avg_batch_size": round(self.batched_requests / self.batches, 2) if self.batches else 0.0,
+            "requests_per_s": round(self.requests / uptime, 2) if uptime > 0 else 0.0,
+            "words_per_s": round(self.words_generated / uptime, 2) if uptime > 0 else 0.0,
+            "latency_p50_ms": round(percentile(self.latencies_ms, 50), 3),
+            "latency_p99_ms": round(percentile(self.latencies_ms, 99), 3),
+        }
+
+
+# --- Part 3: The Server ---
+
+class MarkovServer:
+    """
+    Serves text generation from a single, pre-built Markov chain.
+
+    Each connection handler puts its request on a shared queue together with a
+    Future. One batcher task drains the queue: it waits for the first request,
+    then collects whatever else arrives within `max_wait_ms` (up to `max_batch`
+    requests) and generates the whole batch in one executor call. Under load
+    this turns many tiny thread hand-offs into a few larger ones.
+    """
+
+    def __init__(self, markov_chain: dict, order: int, max_batch: int = 64, max_wait_ms: float = 2.0):
+        self.markov_chain = markov_chain
+        self.order = order
+        self.max_batch = max_batch
+        self.max_wait = max_wait_ms / 1000.0
+        self.stats = ServerStats()
+        # The list of states is built once, instead of once per generate_text call.
+        self._states = list(markov_chain.keys())
+        self._rng = random.Random()
+        self._queue = None
+        self._batcher = None
+
+    def _generate_one(self, length: int, seed) -> str:
+        rng = random.Random(seed) if seed is not None else self._rng
+        start_state = rng.choice(self._states) if self._states else None
+        return generate_text(self.markov_chain, length=length, order=self.order,
+                             rng=rng, start_state=start_state, verbose=False)
+
+    def _generate_batch(self, requests: list) -> list:
+        # Runs in a worker thread. Errors are returned per request so one bad
+        # request cannot fail the whole batch.
+        results = []
+        for length, seed in requests:
+            try:
+                results.append((True, self._generate_one(length, seed)))
+            except Exception as exc:
+                results.append((False, str(exc)))
+        return results
+
+    async def _run_batcher(self) -> None:
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = [await self._queue.get()]
+            deadline = loop.time() + self.max_wait
+            while len(batch) < self.max_batch:
+                timeout = deadline - loop.time()
+                if timeout <= 0:
+                    break
+                try:
+                    batch.append(await asyncio.wait_for(self._queue.get(), timeout))
+                except asyncio.TimeoutError:
+                    break
+
+            self.stats.record_batch(len(batch))
+            results = await loop.run_in_executor(
+                None, self._generate_batch, [(length, seed) for length, seed, _ in batch]
+            )
+            for (_, _, future), result in zip(batch, results):
+                if not future.done():
+                    future.set_result(result)
+
+    async def submit(self, length: int, seed=None) -> str:
+        """
+        Queues one generation request and waits for its text.
+        """
+        future = asyncio.get_running_loop().create_future()
+        await self._queue.put((length, seed, future))
+        ok, value = await future
+        if not ok:
+            raise RuntimeError(value)
+        return value
+
+    async def _handle(self, request: dict) -> dict:
+        op = request.get("op", "generate")
+        if op == "stats":
+            return {"ok": True, "stats": self.stats.snapshot()}
+        if op != "generate":
+            raise ValueError(f"Unknown op: {op!r}")
+
+        length = request.get("length", 50)
+        if not isinstance(length, int) or isinstance(length, bool) or length < 1:
+            raise ValueError("'length' must be a positive integer.")
+        if length > MAX_LENGTH:
+            raise ValueError(f"'length' must be at most {MAX_LENGTH}.")
+        started = time.perf_counter()
+        text = await self.submit(length, request.get("seed"))
+        self.stats.record_request((time.perf_counter() - started) * 1000.0, len(text.split()))
+        return {"ok": True, "text": text}
+
+    async def handle_connection(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        """
+        Serves requests on one connection until the client disconnects.
+        """
+        try:
+            while True:
+                try:
+                    request = await read_message(reader)
+                except asyncio.IncompleteReadError:
+                    break
+                try:
+                    response = await self._handle(request)
+                except Exception as exc:
+                    self.stats.errors += 1
+                    response = {"ok": False, "error": str(exc)}
+                write_message(writer, response)
+                await writer.drain()
+        except (ValueError, ConnectionError) as exc:
+            # Malformed frame or a peer that vanished: drop this connection only.
+            self.stats.errors += 1
+            print(f"Closing connection: {exc}")
+        finally:
+            writer.close()
+
+    async def serve(self, socket_path: str) -> None:
+        """
+        Listens on `socket_path` until cancelled.
+        """
+        # A stale socket file from a previous run would make bind() fail.
+        if os.path.exists(socket_path):
+            os.unlink(socket_path)
+
+        self._queue = asyncio.Queue()
+        self._batcher = asyncio.create_task(self._run_batcher())
+        server = await asyncio.start_unix_server(self.handle_connection, path=socket_path)
+        print(f"Serving Markov chain ({len(self._states)} states, order {self.order}) on {socket_path}")
+        try:
+            async with server:
+                await server.serve_forever()
+        finally:
+            self._batcher.cancel()
+            if os.path.exists(socket_path):
+                os.unlink(socket_path)
+
+
+# --- Part 4: The Client ---
+
+class MarkovClient:
+    """
+    A minimal asyncio client for MarkovServer. One client is one connection;
+    requests on a connection are answered in order.
+    """
+
+    def __init__(self, socket_path: str = DEFAULT_SOCKET_PATH):
+        self.socket_path = socket_path
+        self._reader = None
+        self._writer = None
+
+    async def connect(self) -> "MarkovClient":
+        self._reader, self._writer = await asyncio.open_unix_connection(self.socket_path)
+        return self
+
+    async def close(self) -> None:
+        if self._writer is not None:
+            self._writer.close()
+            await self._writer.wait_closed()
+            self._writer = None
+
+    async def __aenter__(self) -> "MarkovClient":
+        return await self.connect()
+
+    async def __aexit__(self, *exc_info) -> None:
+        await self.close()
+
+    async def request(self, message: dict) -> dict:
+        write_message(self._writer, message)
+        await self._writer.drain()
+        response = await read_message(self._reader)
+        if not response.get("ok"):
+            raise RuntimeError(response.get("error", "Unknown server error"))
+        return response
+
+    async def generate(self, length: int = 50, seed=None) -> str:
+        message = {"op": "generate", "length": length}
+        if seed is not None:
+            message["seed"] = seed
+        return (await self.request(message))["text"]
+
+    async def stats(self) -> dict:
+        return (await self.request({"op": "stats"}))["stats"]
+
+
+# --- Part 5: The Load Generator ---
+
+async def run_load(socket_path: str, concurrency: int = 16, total_requests: int = 2000,
+                   length: int = 30) -> dict:
+    """
+    Fires `total_requests` generation requests from `concurrency` connections
+    and reports client-side latency percentiles and throughput.
+    """
+    latencies_ms = []
+    remaining = iter(range(total_requests))
+
+    async def worker() -> None:
+        async with MarkovClient(socket_path) as client:
+            for _ in remaining:
+                started = time.perf_counter()
+                await client.generate(length)
+                latencies_ms.append((time.perf_counter() - started) * 1000.0)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - started
+
+    async with MarkovClient(socket_path) as client:
+        server_stats = await client.stats()
+
+    return {
+        "requests": len(latencies_ms),
+        "concurrency": concurrency,
+        "elapsed_s": round(elapsed, 3),
+        "requests_per_s": round(len(latencies_ms) / elapsed, 2) if elapsed > 0 else 0.0,
+        "latency_p50_ms": round(percentile(latencies_ms, 50), 3),
+        "latency_p99_ms": round(percentile(latencies_ms, 99), 3),
+        "server": server_stats,
+    }
+
+
+# --- Part 6: Command Line ---
+
+SAMPLE_CORPUS = (
+    "The quick brown fox jumps over the lazy dog. The dog barks loudly. "
+    "The quick fox is very fast. Brown dogs are often lazy. "
+    "A quick brown fox can outsmart a lazy dog. The dog and the fox are friends. "
+    "A truly quick brown fox will always outsmart a truly lazy dog. "
+    "The fox saw the dog, and the dog saw the fox. They were both quick."
+)
+
+
+def load_chain(corpus_path: str, order: int) -> dict:
+    """
+    Builds the chain from a corpus file, or from the tutorial's sample corpus.
+    """
+    if corpus_path:
+        with open(corpus_path, "r", encoding="utf-8") as corpus_file:
+            text = corpus_file.read()
+    else:
+        text = SAMPLE_CORPUS
+    return build_markov_chain(text, order=order)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Markov chain text generation over a Unix domain socket.")
+    parser.add_argument("--socket", default=DEFAULT_SOCKET_PATH, help="Path of the Unix domain socket.")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    serve_cmd = commands.add_parser("serve", help="Load the chain once and serve requests.")
+    serve_cmd.add_argument("--corpus", help="Text file to train on (defaults to a small sample corpus).")
+    serve_cmd.add_argument("--order", type=int, default=2)
+    serve_cmd.add_argument("--max-batch", type=int, default=64)
+    serve_cmd.add_argument("--max-wait-ms", type=float, default=2.0)
+
+    generate_cmd = commands.add_parser("generate", help="Request a single piece of text.")
+    generate_cmd.add_argument("--length", type=int, default=30)
+    generate_cmd.add_argument("--seed", type=int)
+
+    commands.add_parser("stats", help="Print the server's counters.")
+
+    bench_cmd = commands.add_parser("bench", help="Run the load generator against a running server.")
+    bench_cmd.add_argument("--concurrency", type=int, default=16)
+    bench_cmd.add_argument("--requests", type=int, default=2000)
+    bench_cmd.add_argument("--length", type=int, default=30)
+
+    args = parser.parse_args()
+
+    if args.command == "serve":
+        print("--- Building Markov Chain ---")
+        chain = load_chain(args.corpus, args.order)
+        server = MarkovServer(chain, args.order, max_batch=args.max_batch, max_wait_ms=args.max_wait_ms)
+        try:
+            asyncio.run(server.serve(args.socket))
+        except KeyboardInterrupt:
+            print("\nServer stopped.")
+    elif args.command == "generate":
+        async def generate_once():
+            async with MarkovClient(args.socket) as client:
+                return await client.generate(args.length, args.seed)
+        print(asyncio.run(generate_once()))
+    elif args.command == "stats":
+        async def fetch_stats():
+            async with MarkovClient(args.socket) as client:
+                return await client.stats()
+        print(json.dumps(asyncio.run(fetch_stats()), indent=2))
+    elif args.command == "bench":
+        results = asyncio.run(run_load(args.socket, args.concurrency, args.requests, args.length))
+        print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
+
+# --- Example Usage ---
+#
+# Terminal 1 (the chain is built once, here):
+#   python markov_server.py serve --corpus my_corpus.txt --order 2
+#
+# Terminal 2:
+#   python markov_server.py generate --length 40 --seed 1
+#   python markov_server.py bench --concurrency 32 --requests 5000
+#   python markov_server.py stats
+#
+# The bench command prints client-side p50/p99 latency and requests/sec,
+# followed by the server's own counters (including the average batch size,
+# which grows as you raise --concurrency).
@@ -8,6 +8,9 @@
 # Plotly.express is built on top of Plotly.graph_objects, providing a higher-level interface.
 # For this tutorial, we will focus on creating a bar chart, a versatile tool for comparing categories.
 
+import os
+import sys
+
 import plotly.express as px
 import pandas as pd
 
@@ -24,6 +27,161 @@ data = {
 }
 df = pd.DataFrame(data)
 
+# --- Loading Real Sales Data Efficiently ---
+# A dict of lists like the one above gives columns of dtype 'object': every
+# cell is a separate Python string, costing ~50+ bytes each plus a pointer.
+# Sales tables repeat the same few product, category and month names millions
+# of times, which is exactly what pandas' 'category' dtype is for: each
+# distinct string is stored once, and every row holds a small integer code.
+# Grouping by a categorical column works on those integer codes too, so every
+# groupby gets faster as well.
+#
+# We also read only the columns the chart needs, and store Sales in the
+# smallest numeric type that holds every value exactly.
+
+SALES_COLUMNS = ['Product', 'Category', 'Month', 'Sales']
+CATEGORICAL_COLUMNS = ['Product', 'Category', 'Month']
+
+
+def memory_usage_bytes(frame):
+    """
+    Returns the true memory footprint of a DataFrame, strings included.
+    """
+    return int(frame.memory_usage(deep=True).sum())
+
+
+def smallest_numeric(values):
+    """
+    Downcasts a numeric Series to the smallest dtype that keeps every value.
+    """
+    if pd.api.types.is_integer_dtype(values):
+        kind = 'unsigned' if len(values) and values.min() >= 0 else 'integer'
+        return pd.to_numeric(values, downcast=kind)
+    if pd.api.types.is_float_dtype(values):
+        as_float32 = values.astype('float32')
+        # Only keep float32 if no value changes (money often needs float64).
+        if as_float32.astype(values.dtype).equals(values):
+            return as_float32
+    return values
+
+
+def optimize_sales_dtypes(sales_df):
+    """
+    Returns a copy of `sales_df` with categorical text columns and a compact Sales column.
+    """
+    optimized = sales_df.copy()
+    for column in CATEGORICAL_COLUMNS:
+        if column in optimized:
+            optimized[column] = optimized[column].astype('category')
+    if 'Sales' in optimized:
+        optimized['Sales'] = smallest_numeric(pd.to_numeric(optimized['Sales']))
+    return optimized
+
+
+def load_sales(path, columns=SALES_COLUMNS, verbose=True):
+    """
+    Loads sales data from a Parquet or CSV file, keeping only `columns`.
+
+    The memory used before and after the dtype conversion is stored in
+    `result.attrs['memory_report']` (and printed if `verbose`).
+
+    Args:
+        path (str): A .parquet/.pq file or a CSV file.
+        columns (list): The columns to read; everything else is skipped at read time.
+        verbose (bool): Print the memory report.
+
+    Returns:
+        pd.DataFrame: The sales table with optimized dtypes.
+    """
+    extension = os.path.splitext(path)[1].lower()
+    if extension in ('.parquet', '.pq'):
+        # Parquet is columnar: unselected columns are never even read from disk.
+        raw = pd.read_parquet(path, columns=columns)
+    else:
+        raw = pd.read_csv(path, usecols=columns)
+
+    before = memory_usage_bytes(raw)
+    sales_df = optimize_sales_dtypes(raw)
+    after = memory_usage_bytes(sales_df)
+    sales_df.attrs['memory_report'] = {
+        'rows': len(sales_df),
+        'bytes_before': before,
+        'bytes_after': after,
+        'reduction': round(before / after, 1) if after else None,
+    }
+    if verbose:
+        print(f"Loaded {len(sales_df):,} rows from {path}: "
+              f"{before / 2**20:.1f} MB -> {after / 2**20:.1f} MB after dtype optimization.")
+    return sales_df
+
+# --- Aggregating Before Plotting ---
+# Plotly copies every row of the DataFrame we give it into the figure's JSON.
+# Ten rows is nothing, but a real sales table with tens of millions of rows
+# would produce a figure of hundreds of MB that no browser can open.
+# The chart only shows one bar per Product/Category/Month, though, so we first
+# sum the sales per group with pandas' vectorized `groupby`. The figure then
+# grows with the number of groups, not the number of rows.
+#
+# With many products the x-axis itself becomes unreadable, so we can also keep
+# only the `top_n` best-selling products and fold the rest into one "Other" bar.
+
+GROUP_COLUMNS = ['Product', 'Category', 'Month']
+
+
+def aggregate_sales(sales_df, top_n=None, other_label='Other'):
+    """
+    Sums Sales per Product/Category/Month, optionally bucketing small products.
+
+    Args:
+        sales_df (pd.DataFrame): Raw rows with Product, Category, Month and Sales columns.
+        top_n (int): If given, keep the top_n products by total sales and relabel
+                     every other product as `other_label`.
+        other_label (str): Name of the bucket for products outside the top_n.
+
+    Returns:
+        pd.DataFrame: One row per group with the summed 'Sales' and the number
+                      of raw rows that went into it ('Orders').
+    """
+    # observed=True: with categorical columns, only emit groups that actually
+    # occur (instead of every Product x Category x Month combination).
+    # sort=False keeps groups in order of first appearance (Jan before Feb).
+    grouped = sales_df.groupby(GROUP_COLUMNS, observed=True, sort=False)['Sales']
+    aggregated = grouped.agg(Sales='sum', Orders='count').reset_index()
+    if top_n is not None:
+        aggregated = bucket_top_products(aggregated, top_n, other_label)
+    return aggregated
+
+
+def bucket_top_products(aggregated, top_n, other_label='Other'):
+    """
+    Relabels every product outside the top_n (by total sales) of an already
+    aggregated table as `other_label`, and merges the groups that now coincide.
+    """
+    product_totals = aggregated.groupby('Product', observed=True)['Sales'].sum()
+    top_products = product_totals.nlargest(top_n).index
+    product = aggregated['Product'].astype(object)
+    aggregated = aggregated.assign(Product=product.where(product.isin(top_products), other_label))
+    return (aggregated.groupby(GROUP_COLUMNS, observed=True, sort=False)
+            .agg(Sales=('Sales', 'sum'), Orders=('Orders', 'sum'))
+            .reset_index())
+
+
+def build_sales_figure(sales_df, top_n=None, aggregate=True, title='Product Sales by Category and Month'):
+    """
+    Builds the grouped bar chart, aggregating the rows first unless told not to.
+    """
+    plot_df = aggregate_sales(sales_df, top_n=top_n) if aggregate else sales_df
+    return px.bar(
+        data_frame=plot_df,
+        x='Product',
+        y='Sales',
+        color='Category',
+        barmode='group',
+        title=title,
+        labels={'Product': 'Product Name', 'Sales': 'Total Sales ($)'},
+        hover_data=['Category', 'Month']
+    )
+
 # --- Creating the Interactive Visualization ---
 # The core of our interactive visualization will be created using Plotly Express.
 # 'px.bar' is the function for generating bar charts.
@@ -41,16 +199,11 @@ df = pd.DataFrame(data)
 #                                     these additional data points will be displayed. This is crucial for
 #                                     providing context and deeper insights without cluttering the initial view.
 
-fig = px.bar(
-    data_frame=df,
-    x='Product',
-    y='Sales',
-    color='Category',
-    barmode='group',
-    title='Product Sales by Category and Month',
-    labels={'Product': 'Product Name', 'Sales': 'Total Sales ($)'},
-    hover_data=['Category', 'Month']
-)
+# All of these are passed in build_sales_figure above, which hands px.bar the
+# aggregated table. With our small example every group is a single row, so the
+# chart looks exactly as it would with the raw data.
+
+fig = build_sales_figure(df)
 
 # --- Enhancing Interactivity (Optional but Recommended) ---
 # While Plotly Express provides good default interactivity (like hover info),
@@ -72,6 +225,8 @@ fig = px.bar(
 # 2. Save this code as a Python file (e.g., interactive_sales.py).
 # 3. Uncomment the 'fig.show()' line.
 # 4. Run the file from your terminal: python interactive_sales.py
+#    To chart your own data, pass a Parquet or CSV file with Product, Category,
+#    Month and Sales columns: python interactive_sales.py sales.parquet
 
 # When the plot appears, try the following:
 # - Hover your mouse over individual bars to see the detailed information (Product, Sales, Category, Month).
@@ -79,6 +234,14 @@ fig = px.bar(
 # - Notice how bars for the same product are grouped together by month, allowing for month-over-month comparison.
 # - Use the legend on the right to click on a category and filter the view, showing only bars of that category.
 
-print("Interactive visualization created. Uncomment 'fig.show()' to display it.")
-print("Example DataFrame:")
-print(df)
\ No newline at end of file
+# The messages below only print when this file is run directly, so other
+# scripts can `import python_demo_0988b1` to reuse aggregate_sales quietly.
+if __name__ == "__main__":
+    # Pass a Parquet or CSV file to chart your own data instead of the example.
+    if len(sys.argv) > 1:
+        df = load_sales(sys.argv[1])
+        fig = build_sales_figure(df, top_n=20)
+    print("Interactive visualization created. Uncomment 'fig.show()' to display it.")
+    print("Example DataFrame:")
+    print(df)
+    print(f"Rows plotted: {len(aggregate_sales(df))} groups from {len(df)} raw rows.")
\ No newline at end of file
@@ -57,7 +57,8 @@ def build_markov_chain(text: str, order: int = 2) -> dict:
 
     return markov_chain
 
-def generate_text(markov_chain: dict, length: int = 50, order: int = 2) -> str:
+def generate_text(markov_chain: dict, length: int = 50, order: int = 2,
+                  rng: random.Random = None, start_state: tuple = None, verbose: bool = True) -> str:
     """
     Generates new text using the trained Markov chain.
 
@@ -65,6 +66,13 @@ def generate_text(markov_chain: dict, length: int = 50, order: int = 2) -> str:
         markov_chain (dict): The Markov chain built by build_markov_chain.
         length (int): The desired number of words in the generated text.
         order (int): The order of the Markov chain (must match the order used to build the chain).
+        rng (random.Random): Optional random generator. Pass a seeded instance to make
+                             the output reproducible; defaults to the global `random` module.
+        start_state (tuple): Optional initial state. Long-running callers (such as the
+                             socket server) pick it from a cached key list so we don't
+                             rebuild `list(markov_chain.keys())` on every call.
+        verbose (bool): Print a message when generation stops at a dead end. Servers
+                        and benchmarks pass False to keep their output clean.
 
     Returns:
         str: The newly generated text.
@@ -74,9 +82,14 @@ def generate_text(markov_chain: dict, length: int = 50, order: int = 2) -> str:
     if not markov_chain:
         return "Cannot generate text: Markov chain is empty."
 
+    if rng is None:
+        rng = random
+
     # Start the text generation by picking a random initial state (a key from our chain).
     # We convert markov_chain.keys() to a list to allow random.choice to pick an element.
-    current_state = random.choice(list(markov_chain.keys()))
+    current_state = start_state
+    if current_state is None:
+        current_state = rng.choice(list(markov_chain.keys()))
 
     # Initialize our generated text with the words from our starting state.
     # The '*' unpacks the tuple `current_state` into individual arguments for `list()`'s constructor,
@@ -91,7 +104,7 @@ def generate_text(markov_chain: dict, length: int = 50, order: int = 2) -> str:
         if current_state in markov_chain:
             # Randomly choose the next word from the list of possibilities
             # associated with the current state. This is the core of the generation process.
-            next_word = random.choice(markov_chain[current_state])
+            next_word = rng.choice(markov_chain[current_state])
             generated_words.append(next_word)
 
             # Update the current state for the next iteration.
@@ -104,7 +117,8 @@ def generate_text(markov_chain: dict, length: int = 50, order: int = 2) -> str:
             # This means the training corpus didn't contain any word following this specific sequence.
             # For simplicity, we stop generating text here. In more advanced scenarios,
             # you might restart with a new random state or try backtracking.
-            print(f"Reached a dead end with state {current_state}. Stopping text generation.")
+            if verbose:
+                print(f"Reached a dead end with state {current_state}. Stopping text generation.")
             break
 
     # Join the list of generated words back into a single string, separated by spaces.
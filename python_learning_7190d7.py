@@ -11,9 +11,28 @@
 # We need a powerful library to interact with pre-trained language models.
 # The 'transformers' library from Hugging Face is excellent for this.
 # If you don't have it installed, run: pip install transformers
-from transformers import pipeline
+#
+# Notice that we do NOT import transformers here. Importing it pulls in PyTorch,
+# which takes seconds on its own. Instead we import it inside the functions
+# that actually need it, so `--help` or importing this file for a test is fast.
+import argparse
+import copy
+import json
+import os
+import sys
+import time
+
+from markov_server import percentile
+from story_cache import StoryResultCache, is_deterministic, make_cache_key
+from story_prefix_cache import PrefixKVCache
+from story_snapshot import is_snapshot, load_snapshot_model
 
-# --- Part 2: Loading a Pre-trained Language Model ---
+try:
+    import resource
+except ImportError:  # Not available on Windows; memory is then reported from the model alone.
+    resource = None
+
+# --- Part 2: Loading a Pre-trained Language Model (Lazily) ---
 
 # The 'pipeline' function is a high-level abstraction that makes it easy
 # to use pre-trained models for various tasks.
@@ -21,9 +40,289 @@ from transformers import pipeline
 # 'gpt2' is a widely used and capable, but relatively small, language model
 # that's great for learning and experimentation.
 # The model will be downloaded the first time you run this.
-print("Loading AI model... This may take a moment on the first run.")
-story_generator = pipeline("text-generation", model="gpt2")
-print("Model loaded successfully!")
+#
+# Building the pipeline is the slowest step of the whole program, so we only do
+# it the first time a story is requested, and then keep it for the rest of the
+# process. MODEL_SOURCE can be a hub name like "gpt2" or a local directory
+# (for example one made by `create_tiny_model` below); set the STORY_MODEL
+# environment variable or pass `--model` to change it. With MODEL_OFFLINE set
+# (or `--offline`), the Hugging Face hub is never contacted.
+MODEL_SOURCE = os.environ.get("STORY_MODEL", "gpt2")
+MODEL_OFFLINE = os.environ.get("HF_HUB_OFFLINE", "") not in ("", "0")
+MODEL_QUANTIZE = False  # See Part 2b; set with configure_cpu_performance(quantize=True).
+
+_story_generator = None
+_load_report = {}
+
+
+def _current_rss_bytes():
+    """
+    Returns this process's resident memory in bytes (or None if unknown).
+    """
+    try:
+        with open("/proc/self/statm", "r") as statm:
+            return int(statm.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, AttributeError):
+        pass
+    if resource is not None:
+        # Fall back to the peak RSS (kilobytes on Linux, bytes on macOS).
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return peak if sys.platform == "darwin" else peak * 1024
+    return None
+
+
+def load_story_generator(model_source=None, offline=None, quantize=None):
+    """
+    Builds a text-generation pipeline and records how long it took and how much
+    memory it added.
+
+    Args:
+        model_source (str): A hub model name, a local model directory, or a
+                            snapshot directory from story_snapshot.py (whose
+                            weights are memory-mapped). Defaults to MODEL_SOURCE.
+        offline (bool): If True, never contact the Hugging Face hub; the model
+                        must already be on disk (a local directory or the cache).
+                        Defaults to MODEL_OFFLINE. Local directories are always
+                        loaded offline.
+        quantize (bool): If True, convert the linear layers to dynamic int8
+                         (see Part 2b). Defaults to MODEL_QUANTIZE.
+
+    Returns:
+        The loaded pipeline.
+    """
+    global _load_report
+    import_started = time.perf_counter()
+    from transformers import AutoModelForCausalLM, AutoTokenizer, pipeline
+    import_time = time.perf_counter() - import_started
+
+    model_source = model_source or MODEL_SOURCE
+    if offline is None:
+        offline = MODEL_OFFLINE
+    if quantize is None:
+        quantize = MODEL_QUANTIZE
+    local_files_only = offline or os.path.isdir(model_source)
+
+    # Status messages go to stderr: in batch mode stdout carries the JSON Lines results.
+    print(f"Loading AI model '{model_source}'... This may take a moment on the first run.", file=sys.stderr)
+    rss_before = _current_rss_bytes()
+    started = time.perf_counter()
+
+    tokenizer = AutoTokenizer.from_pretrained(model_source, local_files_only=local_files_only)
+    if is_snapshot(model_source):
+        # A snapshot's weights are memory-mapped rather than read (story_snapshot.py).
+        model = load_snapshot_model(model_source)
+    else:
+        model = AutoModelForCausalLM.from_pretrained(model_source, local_files_only=local_files_only)
+    model.eval()
+    if quantize:
+        model = quantize_model_dynamic(model)
+    generator = pipeline("text-generation", model=model, tokenizer=tokenizer)
+
+    load_time = time.perf_counter() - started
+    rss_after = _current_rss_bytes()
+    _load_report = {
+        "model": model_source,
+        "quantized": bool(quantize),
+        "import_time_s": round(import_time, 3),
+        "load_time_s": round(load_time, 3),
+        "parameters": sum(p.numel() for p in model.parameters()),
+        "weights_bytes": model_nbytes(model),
+        "rss_delta_bytes": (rss_after - rss_before) if rss_before is not None and rss_after is not None else None,
+    }
+    print(f"Model loaded successfully in {load_time:.2f}s "
+          f"({_load_report['weights_bytes'] / 2**20:.1f} MB of weights).", file=sys.stderr)
+    return generator
+
+
+def get_story_generator(model_source=None, offline=None, quantize=None):
+    """
+    Returns the process-wide pipeline, loading it on the first call.
+
+    Later calls return the same object, whatever arguments they pass; call
+    `reset_story_generator()` first if you really want to switch models.
+    """
+    global _story_generator
+    if _story_generator is None:
+        _story_generator = load_story_generator(model_source, offline=offline, quantize=quantize)
+    return _story_generator
+
+
+def reset_story_generator():
+    """
+    Drops the cached pipeline so the next story loads the model again.
+    """
+    global _story_generator, _load_report
+    _story_generator = None
+    _load_report = {}
+
+
+def get_load_report():
+    """
+    Returns load time and memory figures for the cached pipeline ({} if not loaded yet).
+    """
+    return dict(_load_report)
+
+
+def _model_identity():
+    """
+    Names the model that produces our outputs, for use in cache keys. A
+    quantized model gives slightly different stories, so it gets its own name.
+    """
+    name = _load_report.get("model") or MODEL_SOURCE
+    quantized = _load_report.get("quantized", MODEL_QUANTIZE)
+    return name + "+int8" if quantized else name
+
+
+def __getattr__(name):
+    # Older code did `from python_learning_7190d7 import story_generator`.
+    # Module-level __getattr__ (PEP 562) keeps that working, but lazily.
+    if name == "story_generator":
+        return get_story_generator()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+def create_tiny_model(path, seed=0):
+    """
+    Saves a tiny, randomly-initialized GPT-2 (and a matching tokenizer) to `path`.
+
+    It generates gibberish, but it loads in milliseconds and needs no network,
+    which is exactly what tests and quick experiments want:
+
+        create_tiny_model("/tmp/tiny-gpt2")
+        get_story_generator("/tmp/tiny-gpt2")
+    """
+    import torch
+    from tokenizers import ByteLevelBPETokenizer
+    from transformers import GPT2Config, GPT2LMHeadModel, GPT2TokenizerFast
+
+    # A byte-level BPE tokenizer (the same kind GPT-2 uses) trained on a few
+    # sentences. Every byte is in its base vocabulary, so any prompt encodes.
+    sample_text = [
+        "The old wizard lived in a crumbling tower.",
+        "A mysterious spaceship landed in the backyard.",
+        "Once upon a time, in a land far away, there was a small village.",
+    ]
+    bpe = ByteLevelBPETokenizer()
+    bpe.train_from_iterator(sample_text, vocab_size=320, min_frequency=1,
+                            special_tokens=["<|endoftext|>"])
+    tokenizer = GPT2TokenizerFast(tokenizer_object=bpe._tokenizer, bos_token="<|endoftext|>",
+                                  eos_token="<|endoftext|>", unk_token="<|endoftext|>")
+
+    config = GPT2Config(
+        vocab_size=len(tokenizer),
+        n_positions=1024,
+        n_embd=64,
+        n_layer=2,
+        n_head=2,
+        bos_token_id=tokenizer.eos_token_id,
+        eos_token_id=tokenizer.eos_token_id,
+    )
+    torch.manual_seed(seed)
+    model = GPT2LMHeadModel(config)
+
+    os.makedirs(path, exist_ok=True)
+    model.save_pretrained(path)
+    tokenizer.save_pretrained(path)
+    return path
+
+# --- Part 2b: Running Fast on a CPU ---
+
+# Three things make a noticeable difference when there is no GPU:
+#
+# 1. Threads. PyTorch splits each matrix multiplication across "intra-op"
+#    threads and can run independent operations on "inter-op" threads. The
+#    defaults guess from the machine, which is wrong inside containers or when
+#    several processes share a box, so we let you set both explicitly.
+# 2. Inference mode. `torch.inference_mode()` tells PyTorch we will never call
+#    backward(), so it skips all autograd bookkeeping. All generation in this
+#    file runs inside it.
+# 3. Dynamic int8 quantization. Weights of the linear layers are stored as
+#    8-bit integers (4x smaller than float32) and activations are quantized on
+#    the fly. Matrix multiplications then use fast integer kernels. Output
+#    changes slightly, but stories stay just as readable.
+#
+# GPT-2 implements its linear layers with a transformers-specific `Conv1D`
+# module (a linear layer with a transposed weight), which PyTorch's quantizer
+# does not recognise, so we first swap each one for an equivalent nn.Linear.
+
+def configure_cpu_performance(intra_op_threads=None, inter_op_threads=None, quantize=None):
+    """
+    Applies CPU settings for this process.
+
+    Args:
+        intra_op_threads (int): Threads used inside one operation (torch.set_num_threads).
+        inter_op_threads (int): Threads used to run operations in parallel. PyTorch
+                                only accepts this before any parallel work has run.
+        quantize (bool): Load the model with dynamic int8 quantization. Affects
+                         the next model load (see reset_story_generator).
+    """
+    global MODEL_QUANTIZE
+    import torch
+
+    if intra_op_threads:
+        torch.set_num_threads(intra_op_threads)
+    if inter_op_threads:
+        try:
+            torch.set_num_interop_threads(inter_op_threads)
+        except RuntimeError as exc:
+            print(f"Warning: could not set inter-op threads ({exc}).", file=sys.stderr)
+    if quantize is not None:
+        MODEL_QUANTIZE = quantize
+
+
+def _inference_mode():
+    import torch
+    return torch.inference_mode()
+
+
+def model_nbytes(model):
+    """
+    Returns the bytes taken by a model's weights, including quantized ones
+    (which are kept as packed buffers rather than parameters).
+    """
+    def nbytes(value):
+        if hasattr(value, "element_size"):
+            return value.numel() * value.element_size()
+        if isinstance(value, (tuple, list)):
+            return sum(nbytes(item) for item in value)
+        return 0
+
+    return sum(nbytes(value) for value in model.state_dict().values())
+
+
+def _conv1d_to_linear(model):
+    """
+    Replaces every transformers Conv1D in `model` with an equivalent nn.Linear.
+    """
+    from torch import nn
+    from transformers.pytorch_utils import Conv1D
+
+    for parent in list(model.modules()):
+        for name, child in list(parent.named_children()):
+            if isinstance(child, Conv1D):
+                in_features, out_features = child.weight.shape
+                linear = nn.Linear(in_features, out_features)
+                linear.weight.data = child.weight.data.t().contiguous()
+                linear.bias.data = child.bias.data
+                setattr(parent, name, linear)
+    return model
+
+
+def quantize_model_dynamic(model):
+    """
+    Returns `model` with its linear layers converted to dynamic int8.
+    """
+    import warnings
+
+    import torch
+    from torch import nn
+
+    _conv1d_to_linear(model)
+    with warnings.catch_warnings():
+        # Eager-mode quantization is deprecated in favour of torchao, but it is
+        # built into PyTorch and needs no extra install, so we still use it.
+        warnings.simplefilter("ignore")
+        return torch.ao.quantization.quantize_dynamic(model, {nn.Linear}, dtype=torch.qint8, inplace=True)
 
 # --- Part 3: Getting User Input (The Prompt) ---
 
@@ -41,7 +340,7 @@ def get_user_prompt():
 
 # This is where the magic happens! The AI model takes our prompt and
 # predicts the most likely sequence of words to follow.
-def generate_story(prompt, max_length=150, num_return_sequences=1):
+def generate_story(prompt, max_length=150, num_return_sequences=1, seed=None, **generate_kwargs):
     """
     Generates a story using the AI model based on the provided prompt.
 
@@ -51,21 +350,533 @@ def generate_story(prompt, max_length=150, num_return_sequences=1):
                           the generated text can have.
         num_return_sequences (int): The number of different story variations to generate.
                                     For simplicity, we'll stick to 1 for now.
+        seed (int): Optional random seed. The same prompt, settings and seed
+                    always give the same story, which also makes the result
+                    cacheable (see `enable_result_cache`).
+        **generate_kwargs: Extra sampling parameters (e.g. top_k, temperature).
     """
+    # Seeded (or non-sampling) requests always produce the same output, so if
+    # the result cache is on we may be able to skip the model entirely.
+    cache_key = None
+    if _result_cache is not None:
+        if is_deterministic(seed, generate_kwargs):
+            cache_key = make_cache_key(_model_identity(), prompt, max_length, num_return_sequences,
+                                       seed, generate_kwargs)
+            cached = _result_cache.get(cache_key)
+            if cached is not None:
+                print("\nFound your story in the cache!")
+                return cached
+        else:
+            _result_cache.note_uncacheable()
+
     print("\nGenerating your story...")
+    generated_texts = _run_story_pipeline(prompt, max_length, num_return_sequences, seed, generate_kwargs)
+    if cache_key is not None:
+        _result_cache.put(cache_key, generated_texts)
+    return generated_texts
+
+
+def _run_story_pipeline(prompt, max_length, num_return_sequences, seed, generate_kwargs):
+    """
+    Runs one prompt through the model (no cache, no messages).
+    """
     # The 'story_generator' is our loaded model.
     # We pass the user's 'prompt' to it.
     # 'max_length' controls how long the generated text can be.
     # 'num_return_sequences' allows for generating multiple options if desired.
-    generated_texts = story_generator(
-        prompt,
-        max_length=max_length,
-        num_return_sequences=num_return_sequences,
-        # 'pad_token_id' helps the model know when to stop generating if it's shorter than max_length.
-        # For GPT-2, it's often set to the end-of-sequence token id.
-        pad_token_id=story_generator.tokenizer.eos_token_id
-    )
-    return generated_texts
+    # The first call loads the model; every later call reuses it.
+    story_generator = get_story_generator()
+    if seed is not None:
+        from transformers import set_seed
+        set_seed(seed)
+    with _inference_mode():
+        return story_generator(
+            prompt,
+            max_length=max_length,
+            num_return_sequences=num_return_sequences,
+            # 'pad_token_id' helps the model know when to stop generating if it's shorter than max_length.
+            # For GPT-2, it's often set to the end-of-sequence token id.
+            pad_token_id=story_generator.tokenizer.eos_token_id,
+            **generate_kwargs
+        )
+
+
+# --- Part 4a: Remembering Stories We Already Wrote (Result Cache) ---
+
+# Users often resubmit the same prompt. When the request is deterministic we
+# can store the finished result and hand it back next time without running
+# GPT-2 at all. The cache itself lives in story_cache.py.
+_result_cache = None
+
+
+def enable_result_cache(max_bytes=64 * 2**20, disk_path=None):
+    """
+    Turns on result caching for generate_story.
+
+    Args:
+        max_bytes (int): Memory budget for the in-memory LRU tier.
+        disk_path (str): Optional SQLite file for a tier that survives restarts.
+
+    Returns:
+        StoryResultCache: The cache; call `.stats()` on it for hit/miss counters.
+    """
+    global _result_cache
+    disable_result_cache()
+    _result_cache = StoryResultCache(max_bytes=max_bytes, disk_path=disk_path)
+    return _result_cache
+
+
+def disable_result_cache():
+    global _result_cache
+    if _result_cache is not None:
+        _result_cache.close()
+    _result_cache = None
+
+
+def get_result_cache():
+    """
+    Returns the active StoryResultCache, or None if caching is off.
+    """
+    return _result_cache
+
+# --- Part 4b: Generating Many Stories at Once (Batching) ---
+
+# Calling generate_story in a loop runs the model on one prompt at a time, which
+# leaves most of the CPU's vector units idle. Instead we run several prompts
+# through the model together in one "batch".
+#
+# Prompts in a batch must have the same number of tokens, so shorter ones are
+# padded. GPT-2 reads left-to-right and continues from the LAST token, so we pad
+# on the LEFT (padding on the right would put pad tokens between the prompt and
+# the continuation). Padding is wasted work, so we also sort prompts by length
+# ("length bucketing") so each batch holds prompts of similar size.
+
+def _token_batches(tokenizer, prompts, batch_size, bucket_window):
+    """
+    Yields lists of (index, prompt, token_ids), each at most `batch_size` long.
+
+    Prompts are read `batch_size * bucket_window` at a time and sorted by token
+    length within that window, so the input can be an endless iterator.
+    """
+    window = []
+    for index, prompt in enumerate(prompts):
+        window.append((index, prompt, tokenizer(prompt)["input_ids"]))
+        if len(window) == batch_size * bucket_window:
+            window.sort(key=lambda item: len(item[2]))
+            for start in range(0, len(window), batch_size):
+                yield window[start:start + batch_size]
+            window = []
+    window.sort(key=lambda item: len(item[2]))
+    for start in range(0, len(window), batch_size):
+        yield window[start:start + batch_size]
+
+
+def iter_story_batches(prompts, batch_size=8, max_length=150, num_return_sequences=1,
+                       bucket_window=16, **generate_kwargs):
+    """
+    Generates stories for many prompts, yielding results one batch at a time.
+
+    Args:
+        prompts (iterable of str): The prompts. May be a lazy iterator.
+        batch_size (int): How many prompts run through the model together.
+        max_length (int): Maximum tokens per story, prompt included. Within a
+                          batch, every prompt gets the same number of new tokens,
+                          chosen so the longest prompt stays within max_length.
+        num_return_sequences (int): Story variations per prompt.
+        bucket_window (int): How many batches' worth of prompts are sorted by
+                             length together. Larger means less padding.
+        **generate_kwargs: Extra arguments for `model.generate` (e.g. top_k).
+
+    Yields:
+        (results, stats): `results` is a list of (index, prompt, generated_texts)
+        where `index` is the prompt's position in the input and generated_texts
+        has the same shape generate_story returns. Because of length bucketing,
+        batches do NOT come back in input order. `stats` holds the batch's
+        size, new token count, elapsed seconds and tokens/sec.
+    """
+    tokenizer = get_story_generator().tokenizer
+    generate_kwargs.setdefault("do_sample", True)
+    for batch in _token_batches(tokenizer, prompts, batch_size, bucket_window):
+        yield generate_token_batch(batch, max_length, num_return_sequences, **generate_kwargs)
+
+
+def generate_token_batch(batch, max_length=150, num_return_sequences=1, **generate_kwargs):
+    """
+    Runs one already-tokenized batch through the model.
+
+    Args:
+        batch (list): (index, prompt, token_ids) tuples, as made by _token_batches.
+        max_length, num_return_sequences, **generate_kwargs: As for iter_story_batches.
+
+    Returns:
+        (results, stats): One item of what iter_story_batches yields.
+    """
+    import torch
+
+    story_generator = get_story_generator()
+    tokenizer, model = story_generator.tokenizer, story_generator.model
+    pad_id = tokenizer.pad_token_id if tokenizer.pad_token_id is not None else tokenizer.eos_token_id
+
+    longest = max(len(ids) for _, _, ids in batch)
+    input_ids = torch.full((len(batch), longest), pad_id, dtype=torch.long)
+    attention_mask = torch.zeros((len(batch), longest), dtype=torch.long)
+    for row, (_, _, ids) in enumerate(batch):
+        if ids:
+            input_ids[row, longest - len(ids):] = torch.tensor(ids)
+            attention_mask[row, longest - len(ids):] = 1
+
+    started = time.perf_counter()
+    with _inference_mode():
+        output_ids = model.generate(
+            input_ids=input_ids,
+            attention_mask=attention_mask,
+            max_new_tokens=max(1, max_length - longest),
+            num_return_sequences=num_return_sequences,
+            pad_token_id=pad_id,
+            **generate_kwargs,
+        )
+    elapsed = time.perf_counter() - started
+
+    # generate() returns num_return_sequences rows per prompt, in prompt order.
+    new_ids = output_ids[:, longest:]
+    new_tokens = int((new_ids != pad_id).sum())
+    continuations = tokenizer.batch_decode(new_ids, skip_special_tokens=True)
+    results = []
+    for row, (index, prompt, _) in enumerate(batch):
+        texts = continuations[row * num_return_sequences:(row + 1) * num_return_sequences]
+        results.append((index, prompt, [{"generated_text": prompt + text} for text in texts]))
+
+    stats = {
+        "batch_size": len(batch),
+        "new_tokens": new_tokens,
+        "elapsed_s": round(elapsed, 4),
+        "tokens_per_s": round(new_tokens / elapsed, 1) if elapsed > 0 else None,
+    }
+    return results, stats
+
+
+def generate_stories(prompts, batch_size=8, max_length=150, num_return_sequences=1, **generate_kwargs):
+    """
+    Batched version of generate_story: returns one list of stories per prompt,
+    in the same order as `prompts`.
+    """
+    prompts = list(prompts)
+    ordered = [None] * len(prompts)
+    for results, _ in iter_story_batches(prompts, batch_size, max_length, num_return_sequences,
+                                         **generate_kwargs):
+        for index, _, generated_texts in results:
+            ordered[index] = generated_texts
+    return ordered
+
+
+def run_jsonl_batch(input_file, output_file, batch_size=8, max_length=150, num_return_sequences=1,
+                    workers=0, threads_per_worker=1, seed=None):
+    """
+    Reads prompts as JSON Lines and writes one JSON line per prompt.
+
+    Each input line is either a JSON string or an object with a "prompt" key
+    (and optionally an "id", which is copied to the output). Output lines are
+    written and flushed as soon as each batch finishes, so a downstream
+    consumer sees results while the rest are still being generated.
+
+    With `workers` > 0, batches are spread over a pool of forked processes
+    that share the model's weights (see story_pool.py).
+
+    With a `seed`, every story is exactly the one generate_story(prompt,
+    seed=seed) returns, and it is looked up in and stored to the result cache
+    (if enabled) under the same key. Sampling a batch draws from one random
+    stream shared by all its prompts, so seeded prompts are generated one at
+    a time, in this process; a seed cannot be combined with `workers`.
+    """
+    if seed is not None and workers:
+        raise ValueError("A seed cannot be combined with workers: seeded stories are generated one at a time.")
+    records = []
+    from_cache = 0
+
+    def read_prompts():
+        for line in input_file:
+            line = line.strip()
+            if not line:
+                continue
+            record = json.loads(line)
+            if isinstance(record, str):
+                record = {"prompt": record}
+            records.append(record)
+            yield record["prompt"]
+
+    def write_result(index, generated_texts):
+        record = records[index]
+        output = {"index": index, "prompt": record["prompt"],
+                  "stories": [story["generated_text"] for story in generated_texts]}
+        if "id" in record:
+            output["id"] = record["id"]
+        output_file.write(json.dumps(output) + "\n")
+
+    if seed is not None:
+        get_story_generator()  # Load up front so the timing below excludes it.
+        started = time.perf_counter()
+        for index, prompt in enumerate(read_prompts()):
+            cache_key = None
+            if _result_cache is not None:
+                cache_key = make_cache_key(_model_identity(), prompt, max_length, num_return_sequences, seed, {})
+                generated_texts = _result_cache.get(cache_key)
+                if generated_texts is not None:
+                    from_cache += 1
+                    write_result(index, generated_texts)
+                    output_file.flush()
+                    continue
+            generated_texts = _run_story_pipeline(prompt, max_length, num_return_sequences, seed, {})
+            if cache_key is not None:
+                _result_cache.put(cache_key, generated_texts)
+            write_result(index, generated_texts)
+            output_file.flush()
+        elapsed = time.perf_counter() - started
+        print(f"Done: {len(records)} prompts ({from_cache} from the result cache) in {elapsed:.2f}s",
+              file=sys.stderr)
+        return
+
+    def read_uncacheable_prompts():
+        # Unseeded sampling never repeats itself, so there is nothing to look up.
+        for prompt in read_prompts():
+            if _result_cache is not None:
+                _result_cache.note_uncacheable()
+            yield prompt
+
+    pool = None
+    if workers:
+        from story_pool import StoryWorkerPool
+        pool = StoryWorkerPool(workers, threads_per_worker=threads_per_worker).start()
+        batches = pool.iter_batches(read_uncacheable_prompts(), batch_size, max_length, num_return_sequences)
+    else:
+        get_story_generator()  # Load up front so the throughput below excludes it.
+        batches = iter_story_batches(read_uncacheable_prompts(), batch_size, max_length, num_return_sequences)
+
+    total_tokens = 0
+    started = time.perf_counter()
+    try:
+        for results, stats in batches:
+            for index, _, generated_texts in results:
+                write_result(index, generated_texts)
+            output_file.flush()
+            total_tokens += stats["new_tokens"]
+            print(f"Batch of {stats['batch_size']}: {stats['new_tokens']} tokens "
+                  f"in {stats['elapsed_s']}s ({stats['tokens_per_s']} tokens/s)", file=sys.stderr)
+    finally:
+        # Also on a failed worker or write: never leave the forked workers running.
+        if pool is not None:
+            pool.close()
+    elapsed = time.perf_counter() - started
+
+    # Model loading is excluded: this is the generation throughput alone.
+    print(f"Done: {len(records)} prompts, {total_tokens} tokens, "
+          f"{total_tokens / elapsed if elapsed > 0 else 0:.1f} tokens/s overall", file=sys.stderr)
+
+# --- Part 4c: Streaming the Story as It Is Written ---
+
+# generate_story returns only when the WHOLE story is done, so the reader stares
+# at a blank screen for the full generation time. Language models produce one
+# token at a time anyway, so we can show each piece as soon as it exists.
+#
+# transformers supports this with "streamers": model.generate calls
+# `streamer.put(token_ids)` after every step. We run generate in a background
+# thread and read decoded text from the streamer in the foreground. Our
+# streamer also records WHEN each token arrived, which gives us the two numbers
+# that matter for perceived speed:
+#   - time to first token (TTFT): how long until the reader sees anything;
+#   - inter-token latency: the gap between consecutive tokens.
+
+def _make_timed_streamer(tokenizer):
+    """
+    Returns a TextIteratorStreamer that also timestamps every generated token.
+    """
+    from transformers import TextIteratorStreamer
+
+    class TimedTextStreamer(TextIteratorStreamer):
+        def __init__(self):
+            super().__init__(tokenizer, skip_prompt=True, skip_special_tokens=True)
+            self.token_times = []
+
+        def put(self, value):
+            # The first put() carries the prompt, which the parent skips.
+            if not self.next_tokens_are_prompt:
+                now = time.perf_counter()
+                self.token_times.extend([now] * value.numel())
+            super().put(value)
+
+    return TimedTextStreamer()
+
+
+def stream_story(prompt, max_length=150, seed=None, stats=None, **generate_kwargs):
+    """
+    Generates one story and yields its text piece by piece as it is produced.
+
+    Pieces are whole words where possible (the streamer waits for a space so
+    it never shows half a word that the next token would change).
+
+    Args:
+        prompt (str): The starting text for the story. It is NOT yielded again.
+        max_length (int): Maximum tokens, prompt included, like generate_story.
+        seed (int): Optional random seed.
+        stats (dict): Optional dict that is filled in when the stream finishes
+                      with time_to_first_token_s, inter-token latency figures
+                      (in ms), the number of new tokens and tokens/sec.
+        **generate_kwargs: Extra sampling parameters for `model.generate`.
+
+    Yields:
+        str: The next piece of the story.
+    """
+    import threading
+
+    story_generator = get_story_generator()
+    tokenizer, model = story_generator.tokenizer, story_generator.model
+    inputs = tokenizer(prompt, return_tensors="pt")
+    prompt_length = inputs["input_ids"].shape[1]
+    if seed is not None:
+        from transformers import set_seed
+        set_seed(seed)
+
+    streamer = _make_timed_streamer(tokenizer)
+    errors = []
+
+    def run_generate():
+        try:
+            # Inference mode is per thread, so it is entered here, not by the caller.
+            with _inference_mode():
+                model.generate(
+                    **inputs,
+                    max_new_tokens=max(1, max_length - prompt_length),
+                    pad_token_id=tokenizer.eos_token_id,
+                    streamer=streamer,
+                    **generate_kwargs,
+                )
+        except Exception as exc:
+            errors.append(exc)
+            streamer.end()  # Unblock the reader below.
+
+    started = time.perf_counter()
+    worker = threading.Thread(target=run_generate, daemon=True)
+    worker.start()
+    for text in streamer:
+        if text:
+            yield text
+    worker.join()
+    if errors:
+        raise errors[0]
+
+    if stats is not None:
+        times = streamer.token_times
+        gaps_ms = [(later - earlier) * 1000.0 for earlier, later in zip(times, times[1:])]
+        total = time.perf_counter() - started
+        stats.update({
+            "new_tokens": len(times),
+            "time_to_first_token_s": round(times[0] - started, 4) if times else None,
+            "inter_token_mean_ms": round(sum(gaps_ms) / len(gaps_ms), 3) if gaps_ms else None,
+            "inter_token_p50_ms": round(percentile(gaps_ms, 50), 3),
+            "inter_token_p99_ms": round(percentile(gaps_ms, 99), 3),
+            "total_s": round(total, 4),
+            "tokens_per_s": round(len(times) / total, 1) if total > 0 else None,
+        })
+
+# --- Part 4d: Reusing a Shared Preamble (Prefix KV Cache) ---
+
+# Many prompts start with the same long preamble, e.g. style instructions
+# followed by the user's sentence. Reading that preamble is the same work every
+# time, so with a prefix cache we run the model over it once, keep the
+# resulting key/value tensors (see story_prefix_cache.py), and start every later
+# generation from that saved state. Only the user's part is processed.
+_prefix_cache = None
+
+
+def enable_prefix_cache(max_bytes=256 * 2**20):
+    """
+    Turns on prefix reuse for generate_story_with_prefix.
+
+    Args:
+        max_bytes (int): Memory budget for stored key/value tensors. A GPT-2
+                         small prefix costs about 36 KB per token.
+
+    Returns:
+        PrefixKVCache: The cache; call `.stats()` on it for hit counters.
+    """
+    global _prefix_cache
+    _prefix_cache = PrefixKVCache(max_bytes=max_bytes)
+    return _prefix_cache
+
+
+def disable_prefix_cache():
+    global _prefix_cache
+    _prefix_cache = None
+
+
+def get_prefix_cache():
+    """
+    Returns the active PrefixKVCache, or None if prefix reuse is off.
+    """
+    return _prefix_cache
+
+
+def generate_story_with_prefix(prefix, prompt, max_length=150, num_return_sequences=1, seed=None,
+                               **generate_kwargs):
+    """
+    Like generate_story(prefix + prompt), but reuses the model state for `prefix`.
+
+    The prefix and the prompt are tokenized separately and joined, so include
+    the separating space or newline at the end of `prefix` (e.g. "...style.\n").
+
+    Args:
+        prefix (str): The shared preamble. Its KV state is cached when the
+                      prefix cache is enabled.
+        prompt (str): The part that differs from request to request.
+        max_length (int): Maximum tokens, preamble and prompt included.
+        num_return_sequences (int): Number of story variations.
+        seed (int): Optional random seed.
+        **generate_kwargs: Extra sampling parameters for `model.generate`.
+
+    Returns:
+        list of dict: Same shape as generate_story's result.
+    """
+    import torch
+
+    story_generator = get_story_generator()
+    tokenizer, model = story_generator.tokenizer, story_generator.model
+    prefix_ids = tokenizer(prefix)["input_ids"]
+    prompt_ids = tokenizer(prompt)["input_ids"]
+
+    # We cache every prefix token except the last one. Generation must be given
+    # at least one token it has not seen yet, and this way that holds even when
+    # `prompt` is empty.
+    cached_ids = prefix_ids[:-1]
+    past_key_values = None
+    if cached_ids:
+        key = PrefixKVCache.make_key(_model_identity(), cached_ids)
+        if _prefix_cache is not None:
+            past_key_values = _prefix_cache.get(key)
+        if past_key_values is None:
+            with _inference_mode():
+                past_key_values = model(torch.tensor([cached_ids]), use_cache=True).past_key_values
+            if _prefix_cache is not None:
+                _prefix_cache.put(key, past_key_values, len(cached_ids))
+                past_key_values = copy.deepcopy(past_key_values)
+        if num_return_sequences > 1:
+            # generate() makes one row per returned sequence; the cache must match.
+            past_key_values.batch_repeat_interleave(num_return_sequences)
+
+    if seed is not None:
+        from transformers import set_seed
+        set_seed(seed)
+    input_ids = torch.tensor([prefix_ids + prompt_ids])
+    with _inference_mode():
+        output_ids = model.generate(
+            input_ids=input_ids,
+            attention_mask=torch.ones_like(input_ids),
+            past_key_values=past_key_values,
+            max_new_tokens=max(1, max_length - input_ids.shape[1]),
+            num_return_sequences=num_return_sequences,
+            pad_token_id=tokenizer.eos_token_id,
+            **generate_kwargs,
+        )
+    continuations = tokenizer.batch_decode(output_ids[:, input_ids.shape[1]:], skip_special_tokens=True)
+    return [{"generated_text": prefix + prompt + text} for text in continuations]
 
 # --- Part 5: Displaying the Story ---
 
@@ -89,17 +900,108 @@ def display_story(generated_texts):
 # --- Part 6: Putting It All Together (Main Execution Block) ---
 
 # This is the main part of our script that runs when you execute the file.
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Generate a short story from a prompt with GPT-2.")
+    parser.add_argument("--model", default=None,
+                        help="Hub model name or local model directory (default: $STORY_MODEL or 'gpt2').")
+    parser.add_argument("--offline", action="store_true",
+                        help="Never contact the Hugging Face hub; use files already on disk.")
+    parser.add_argument("--threads", type=int, help="Intra-op CPU threads (torch.set_num_threads).")
+    parser.add_argument("--interop-threads", type=int, help="Inter-op CPU threads.")
+    parser.add_argument("--quantize", action="store_true",
+                        help="Use dynamic int8 quantization of the linear layers (CPU only).")
+    parser.add_argument("--prompt", help="Start of the story (asked interactively if omitted).")
+    parser.add_argument("--max-length", type=int, default=150)
+    parser.add_argument("--stream", action="store_true",
+                        help="Print the story as it is generated, then report latency figures.")
+    parser.add_argument("--seed", type=int, help="Random seed; seeded stories are reproducible and cacheable.")
+    parser.add_argument("--cache-db", metavar="PATH",
+                        help="Cache seeded results in this SQLite file (kept across runs).")
+    parser.add_argument("--cache-mb", type=float, default=64.0,
+                        help="Memory budget of the in-process result cache, in MB.")
+    parser.add_argument("--batch-file", metavar="JSONL",
+                        help="Generate stories for every prompt in a JSON Lines file ('-' for stdin).")
+    parser.add_argument("--output", metavar="JSONL", help="Where batch results go (default: stdout).")
+    parser.add_argument("--batch-size", type=int, default=8)
+    parser.add_argument("--workers", type=int, default=0,
+                        help="Batch mode: fork this many worker processes sharing one loaded model.")
+    parser.add_argument("--threads-per-worker", type=int, default=1)
+    parser.add_argument("--make-tiny-model", metavar="DIR",
+                        help="Save a tiny random GPT-2 to DIR (for tests) and exit.")
+    args = parser.parse_args(argv)
+    if args.batch_file and args.seed is not None and args.workers:
+        parser.error("--seed cannot be combined with --workers: seeded stories are generated one at a time.")
+    return args
+
+
 if __name__ == "__main__":
+    # story_pool.py imports this file by name. Make that import return this very
+    # module (with the settings applied below) rather than loading a second copy.
+    sys.modules.setdefault("python_learning_7190d7", sys.modules[__name__])
+    args = parse_args()
+
+    if args.make_tiny_model:
+        create_tiny_model(args.make_tiny_model)
+        print(f"Tiny GPT-2 saved to {args.make_tiny_model}")
+        sys.exit(0)
+
+    # Remember which model to use; nothing is loaded until the first story.
+    if args.model:
+        MODEL_SOURCE = args.model
+    if args.offline:
+        MODEL_OFFLINE = True
+    if args.threads or args.interop_threads or args.quantize:
+        configure_cpu_performance(args.threads, args.interop_threads, quantize=args.quantize or None)
+
+    if args.cache_db:
+        enable_result_cache(max_bytes=int(args.cache_mb * 2**20), disk_path=args.cache_db)
+
+    if args.batch_file:
+        input_file = sys.stdin if args.batch_file == "-" else open(args.batch_file, "r", encoding="utf-8")
+        output_file = open(args.output, "w", encoding="utf-8") if args.output else sys.stdout
+        try:
+            run_jsonl_batch(input_file, output_file, batch_size=args.batch_size, max_length=args.max_length,
+                            workers=args.workers, threads_per_worker=args.threads_per_worker, seed=args.seed)
+        finally:
+            if input_file is not sys.stdin:
+                input_file.close()
+            if output_file is not sys.stdout:
+                output_file.close()
+        sys.exit(0)
+
     # 1. Get the story idea from the user.
-    user_prompt = get_user_prompt()
+    user_prompt = args.prompt if args.prompt is not None else get_user_prompt()
+
+    if args.stream:
+        # Streaming variant of steps 2 and 3: print each piece as it arrives.
+        get_story_generator()  # Load first, so TTFT measures generation only.
+        print("\n--- Your AI-Generated Story ---\n")
+        stream_stats = {}
+        print(user_prompt, end="", flush=True)
+        for piece in stream_story(user_prompt, max_length=args.max_length, seed=args.seed, stats=stream_stats):
+            print(piece, end="", flush=True)
+        print("\n" + "-" * 20)
+        print(f"Time to first token: {stream_stats['time_to_first_token_s']}s, "
+              f"inter-token latency p50 {stream_stats['inter_token_p50_ms']} ms / "
+              f"p99 {stream_stats['inter_token_p99_ms']} ms, {stream_stats['tokens_per_s']} tokens/s")
+        print("\n--- End of Story Generator ---")
+        sys.exit(0)
 
     # 2. Generate the story using the AI model.
     # We're asking for a story up to 150 words long.
-    generated_story_options = generate_story(user_prompt, max_length=150)
+    generated_story_options = generate_story(user_prompt, max_length=args.max_length, seed=args.seed)
 
     # 3. Show the generated story to the user.
     display_story(generated_story_options)
 
+    report = get_load_report()
+    if report:
+        print(f"\nModel load: {report['load_time_s']}s, "
+              f"{report['weights_bytes'] / 2**20:.1f} MB weights, "
+              f"RSS +{(report['rss_delta_bytes'] or 0) / 2**20:.1f} MB")
+    if get_result_cache() is not None:
+        print(f"Result cache: {get_result_cache().stats()}")
+
     print("\n--- End of Story Generator ---")
 
 # --- Example Usage ---
@@ -110,17 +1012,24 @@ if __name__ == "__main__":
 # 3. Navigate to the directory where you saved the file.
 # 4. Run the command: python story_generator.py
 #
-# You will be prompted to enter a starting sentence.
+# You will be prompted to enter a starting sentence (or pass --prompt "...").
+# Use --model to point at a local directory, and --offline to never touch the hub.
+# On CPU-only machines, try --threads 4 --quantize (and see story_benchmark.py).
+# Add --stream to watch the story appear word by word (with latency figures).
+# For many prompts at once, put one {"prompt": "..."} per line in a file and run:
+#   python story_generator.py --batch-file prompts.jsonl --output stories.jsonl --batch-size 16
+# Add --workers 4 to spread the batches over four processes (Linux/macOS).
+# For tests, `python story_generator.py --make-tiny-model /tmp/tiny-gpt2` saves a
+# tiny random GPT-2 that loads instantly: then run with --model /tmp/tiny-gpt2.
 #
 # Example Interaction:
 #
-# Loading AI model... This may take a moment on the first run.
-# Model loaded successfully!
-#
 # --- Let's start your story! ---
 # Enter a sentence or a few words to start your story: The old wizard lived in a crumbling tower.
 #
 # Generating your story...
+# Loading AI model 'gpt2'... This may take a moment on the first run.
+# Model loaded successfully in 2.41s (474.7 MB of weights).
 #
 # --- Your AI-Generated Story ---
 #
@@ -0,0 +1,223 @@
+# Learning Objective: Aggregate a sales file that is larger than your RAM.
+#
+# `python_demo_0988b1.py` loads the whole table into a DataFrame before
+# summing it. A month of sales as CSV can be far bigger than memory, but the
+# chart only needs one number per Product/Category/Month. Sums and counts can
+# be computed piece by piece and added up later, so we:
+#
+# 1. Split the file into chunks of roughly `chunk_bytes` (CSV) or into row
+#    groups (Parquet), so only one chunk per worker is ever in memory.
+# 2. Aggregate each chunk with the same vectorized groupby as the demo.
+# 3. Merge each partial result into a running total, whose size depends only
+#    on the number of groups.
+# 4. Optionally run the chunks in a process pool and merge results as they arrive.
+#
+# The result is exactly what `aggregate_sales(load_sales(path))` would return,
+# including the order of the groups, just without ever holding the whole file.
+
+import argparse
+import io
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import pandas as pd
+
+from python_demo_0988b1 import CATEGORICAL_COLUMNS, GROUP_COLUMNS, SALES_COLUMNS, bucket_top_products
+
+# Each partial result remembers where its groups first appeared, as
+# (chunk index << ROW_BITS) + row within the chunk, so the final table can list
+# groups in first-appearance order, like groupby(sort=False) on the full data.
+ROW_BITS = 40
+
+
+# --- Part 1: Splitting the File ---
+
+def csv_chunk_ranges(path, chunk_bytes):
+    """
+    Returns (start, end) byte ranges covering the CSV body in ~chunk_bytes pieces.
+
+    Ranges do not need to fall on line boundaries: each reader skips the
+    partial line at its start and finishes the line that crosses its end.
+    (This assumes no quoted field contains a newline, true for sales exports.)
+    """
+    with open(path, 'rb') as csv_file:
+        header_end = len(csv_file.readline())
+    size = os.path.getsize(path)
+    return [(start, min(start + chunk_bytes, size)) for start in range(header_end, size, chunk_bytes)]
+
+
+def read_csv_range(path, start, end, columns):
+    """
+    Parses the lines of `path` that begin within [start, end).
+    """
+    with open(path, 'rb') as csv_file:
+        header = csv_file.readline()
+        # A line belongs to the range its first byte falls in. Reading from
+        # start-1 up to the next newline skips a line that began before us.
+        csv_file.seek(start - 1)
+        csv_file.readline()
+        if csv_file.tell() >= end:
+            return None
+        body = csv_file.read(end - csv_file.tell())
+        if not body.endswith(b'\n'):
+            body += csv_file.readline()
+    if not body:
+        return None
+    dtypes = {column: 'category' for column in CATEGORICAL_COLUMNS if column in columns}
+    return pd.read_csv(io.BytesIO(header + body), usecols=columns, dtype=dtypes)
+
+
+def read_parquet_row_group(path, row_group, columns):
+    import pyarrow.parquet as pq
+
+    table = pq.ParquetFile(path).read_row_group(row_group, columns=columns)
+    return table.to_pandas()
+
+
+def _is_parquet(path):
+    return os.path.splitext(path)[1].lower() in ('.parquet', '.pq')
+
+
+def plan_chunks(path, chunk_bytes):
+    """
+    Returns the list of chunk descriptions for `path`.
+    """
+    if _is_parquet(path):
+        import pyarrow.parquet as pq
+
+        return [('parquet', row_group) for row_group in range(pq.ParquetFile(path).num_row_groups)]
+    return [('csv', byte_range) for byte_range in csv_chunk_ranges(path, chunk_bytes)]
+
+
+# --- Part 2: Aggregating One Chunk ---
+
+def aggregate_chunk(path, chunk_index, chunk, columns=SALES_COLUMNS):
+    """
+    Reads one chunk and returns its per-group Sales sum, row count and first position.
+    """
+    kind, location = chunk
+    if kind == 'parquet':
+        frame = read_parquet_row_group(path, location, columns)
+    else:
+        frame = read_csv_range(path, location[0], location[1], columns)
+    if frame is None or frame.empty:
+        return None, 0
+
+    frame['_First'] = (chunk_index << ROW_BITS) + pd.RangeIndex(len(frame))
+    partial = (frame.groupby(GROUP_COLUMNS, observed=True, sort=False)
+               .agg(Sales=('Sales', 'sum'), Orders=('Sales', 'count'), _First=('_First', 'min'))
+               .reset_index())
+    # Plain strings merge cleanly across chunks whose categories differ.
+    for column in GROUP_COLUMNS:
+        partial[column] = partial[column].astype(object)
+    return partial, len(frame)
+
+
+def _aggregate_chunk_task(args):
+    return aggregate_chunk(*args)
+
+
+# --- Part 3: Merging ---
+
+def merge_partials(running, partial):
+    """
+    Adds `partial` into the running totals (either may be None).
+    """
+    if partial is None:
+        return running
+    if running is None:
+        return partial
+    combined = pd.concat([running, partial], ignore_index=True)
+    return (combined.groupby(GROUP_COLUMNS, sort=False)
+            .agg(Sales=('Sales', 'sum'), Orders=('Orders', 'sum'), _First=('_First', 'min'))
+            .reset_index())
+
+
+def aggregate_sales_file(path, top_n=None, chunk_bytes=64 * 2**20, workers=0, columns=SALES_COLUMNS):
+    """
+    Aggregates a sales file chunk by chunk, like aggregate_sales but out-of-core.
+
+    Args:
+        path (str): A CSV or Parquet file with Product, Category, Month and Sales.
+        top_n (int): Optionally bucket products outside the top_n as "Other".
+        chunk_bytes (int): Target CSV chunk size. Peak memory is roughly a few
+                           times this per worker. (Parquet uses its row groups.)
+        workers (int): 0 aggregates chunks in this process; N > 0 uses a pool
+                       of N processes.
+        columns (list): Columns to read from the file.
+
+    Returns:
+        pd.DataFrame: Product, Category, Month, Sales, Orders. Details of the
+                      run are in `result.attrs['chunk_report']`.
+    """
+    started = time.perf_counter()
+    chunks = plan_chunks(path, chunk_bytes)
+    tasks = [(path, index, chunk, columns) for index, chunk in enumerate(chunks)]
+
+    running, rows = None, 0
+    if workers:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            # map() hands results back in order, but workers keep running ahead
+            # (up to the pool's queue), and we merge each result as it arrives.
+            for partial, chunk_rows in pool.map(_aggregate_chunk_task, tasks):
+                running = merge_partials(running, partial)
+                rows += chunk_rows
+    else:
+        for task in tasks:
+            partial, chunk_rows = aggregate_chunk(*task)
+            running = merge_partials(running, partial)
+            rows += chunk_rows
+
+    if running is None:
+        result = pd.DataFrame({column: pd.Series(dtype='category') for column in GROUP_COLUMNS})
+        result['Sales'] = pd.Series(dtype='int64')
+        result['Orders'] = pd.Series(dtype='int64')
+    else:
+        result = running.sort_values('_First', kind='stable').drop(columns='_First').reset_index(drop=True)
+        for column in GROUP_COLUMNS:
+            result[column] = result[column].astype('category')
+    if top_n is not None:
+        result = bucket_top_products(result, top_n)
+
+    result.attrs['chunk_report'] = {
+        'chunks': len(chunks),
+        'rows': rows,
+        'groups': len(result),
+        'workers': workers,
+        'elapsed_s': round(time.perf_counter() - started, 3),
+    }
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Aggregate a sales file that does not fit in memory.")
+    parser.add_argument('path', help="CSV or Parquet file with Product, Category, Month and Sales columns.")
+    parser.add_argument('--chunk-mb', type=float, default=64.0, help="CSV chunk size in MB.")
+    parser.add_argument('--workers', type=int, default=0, help="Process pool size (0 = no pool).")
+    parser.add_argument('--top-n', type=int, help="Bucket products outside the top N as 'Other'.")
+    parser.add_argument('--html', help="Also write the bar chart to this HTML file.")
+    args = parser.parse_args()
+
+    aggregated = aggregate_sales_file(args.path, top_n=args.top_n, chunk_bytes=int(args.chunk_mb * 2**20),
+                                      workers=args.workers)
+    report = aggregated.attrs['chunk_report']
+    print(f"Aggregated {report['rows']:,} rows in {report['chunks']} chunks into "
+          f"{report['groups']:,} groups in {report['elapsed_s']}s.")
+    print(aggregated.head(20))
+
+    if args.html:
+        from python_demo_0988b1 import build_sales_figure
+
+        build_sales_figure(aggregated, aggregate=False).write_html(args.html)
+        print(f"Chart written to {args.html}")
+
+
+if __name__ == '__main__':
+    main()
+
+# --- Example Usage ---
+#
+#   python sales_chunked.py sales_2026_03.csv --chunk-mb 128 --workers 8 --top-n 20 --html sales.html
+#
+# Memory stays around (workers + 1) x chunk size, whatever the size of the file.
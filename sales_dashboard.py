@@ -0,0 +1,212 @@
+# Learning Objective: Refresh a live sales chart by redoing only the work that changed.
+#
+# A dashboard that reloads the whole table and rebuilds the figure on every
+# refresh wastes almost all of its time: when today's orders arrive, last
+# month's totals have not changed. This script keeps state between refreshes:
+#
+# 1. Aggregates are cached per partition (by default per Month). Each partition
+#    also stores a fingerprint (a hash of its rows). Only partitions whose
+#    fingerprint changed are aggregated again.
+# 2. The figure is built once. On later refreshes the existing traces get new
+#    x/y/hover arrays inside `fig.batch_update()`, and traces whose data did not
+#    change are not touched at all. Only when a new Category appears (so a new
+#    trace is needed) is the figure rebuilt.
+# 3. Every refresh reports how much work it skipped.
+
+import time
+
+import numpy as np
+import pandas as pd
+
+from python_demo_0988b1 import GROUP_COLUMNS, aggregate_sales, bucket_top_products, build_sales_figure
+
+
+def partition_fingerprint(part):
+    """
+    Returns a cheap content hash of a partition's rows.
+
+    Row hashes are summed, so reordering rows does not change it (the
+    aggregates do not depend on row order either).
+    """
+    hashes = pd.util.hash_pandas_object(part, index=False).to_numpy()
+    # The length guards against the (unlikely) case of row hashes summing to the same value.
+    return len(part), int(hashes.sum(dtype=np.uint64))
+
+
+class SalesDashboard:
+    """
+    Keeps the sales chart and its per-partition aggregates between refreshes.
+
+        dashboard = SalesDashboard(partition_column='Month')
+        dashboard.refresh(sales_df)              # First call: aggregates everything.
+        dashboard.refresh(sales_df_with_today)   # Later: only the changed month.
+        dashboard.figure.show()
+
+    If you already know which partitions changed, pass them as
+    `refresh(new_rows, partitions=['Mar'])`: the other partitions are then
+    neither fingerprinted nor aggregated, and `new_rows` only needs the rows
+    of the listed partitions.
+    """
+
+    def __init__(self, partition_column='Month', top_n=None):
+        self.partition_column = partition_column
+        self.top_n = top_n
+        self.figure = None
+        self.last_report = None
+        self._partitions = {}  # partition value -> (fingerprint, aggregated frame)
+
+    def _split(self, sales_df, partitions):
+        grouped = sales_df.groupby(self.partition_column, observed=True, sort=False)
+        if partitions is None:
+            return {value: part for value, part in grouped}
+        wanted = set(partitions)
+        parts = {value: part for value, part in grouped if value in wanted}
+        # A listed partition with no rows has been emptied (deleted).
+        for value in partitions:
+            parts.setdefault(value, sales_df.iloc[0:0])
+        return parts
+
+    def _combined(self):
+        frames = [aggregated for _, aggregated in self._partitions.values() if len(aggregated)]
+        if not frames:
+            return aggregate_sales(pd.DataFrame({column: [] for column in GROUP_COLUMNS + ['Sales']}))
+        combined = pd.concat(frames, ignore_index=True)
+        if self.partition_column not in GROUP_COLUMNS:
+            # Partitions (e.g. per Region) can share groups: merge their partial sums.
+            combined = (combined.groupby(GROUP_COLUMNS, observed=True, sort=False)
+                        .agg(Sales=('Sales', 'sum'), Orders=('Orders', 'sum')).reset_index())
+        if self.top_n is not None:
+            combined = bucket_top_products(combined, self.top_n)
+        # Partitions are cached in the order they were first seen, so without a
+        # fixed order a patched figure could list bars differently from a rebuild.
+        return combined.sort_values(GROUP_COLUMNS, kind='stable', ignore_index=True)
+
+    @staticmethod
+    def _trace_data(part):
+        return {
+            'x': part['Product'].astype(object).to_numpy(),
+            'y': part['Sales'].to_numpy(),
+            'customdata': np.column_stack([part['Category'].astype(object).to_numpy(),
+                                           part['Month'].astype(object).to_numpy()]),
+        }
+
+    def _patch_figure(self, combined):
+        """
+        Updates the existing traces in place. Returns (updated, unchanged, rebuilt).
+        """
+        by_category = {str(category): part for category, part
+                       in combined.groupby('Category', observed=True, sort=False)}
+        existing = {trace.name: trace for trace in self.figure.data}
+        if set(by_category) - set(existing):
+            # A new colour needs a new trace (and legend entry): rebuild once.
+            self.figure = build_sales_figure(combined, aggregate=False)
+            return 0, 0, True
+
+        updated = unchanged = 0
+        with self.figure.batch_update():
+            for name, trace in existing.items():
+                part = by_category.get(name)
+                if part is None:
+                    new = {'x': [], 'y': [], 'customdata': None}
+                else:
+                    new = self._trace_data(part)
+                same = (trace.x is not None and len(trace.x) == len(new['x'])
+                        and np.array_equal(np.asarray(trace.x, dtype=object), new['x'])
+                        and np.array_equal(np.asarray(trace.y), new['y'])
+                        and np.array_equal(np.asarray(trace.customdata, dtype=object), new['customdata']))
+                if same:
+                    unchanged += 1
+                    continue
+                trace.update(x=new['x'], y=new['y'], customdata=new['customdata'])
+                updated += 1
+        return updated, unchanged, False
+
+    def refresh(self, sales_df, partitions=None):
+        """
+        Brings the cached aggregates and the figure up to date with `sales_df`.
+
+        Args:
+            sales_df (pd.DataFrame): Raw sales rows with the partition column.
+            partitions (list): Optional partition values known to have changed.
+                               If omitted, every partition of `sales_df` is
+                               fingerprinted and partitions missing from it are dropped.
+
+        Returns:
+            dict: What this refresh did and how much work it skipped.
+        """
+        started = time.perf_counter()
+        parts = self._split(sales_df, partitions)
+
+        reaggregated, skipped, rows_aggregated, rows_skipped = [], [], 0, 0
+        for value, part in parts.items():
+            fingerprint = partition_fingerprint(part)
+            cached = self._partitions.get(value)
+            if cached is not None and cached[0] == fingerprint:
+                skipped.append(value)
+                rows_skipped += len(part)
+                continue
+            self._partitions[value] = (fingerprint, aggregate_sales(part))
+            reaggregated.append(value)
+            rows_aggregated += len(part)
+
+        removed = []
+        if partitions is None:
+            removed = [value for value in self._partitions if value not in parts]
+        for value in removed + [value for value in reaggregated if not len(parts[value])]:
+            self._partitions.pop(value, None)
+        aggregated_at = time.perf_counter()
+
+        if self.figure is not None and not reaggregated and not removed:
+            updated, unchanged, rebuilt = 0, len(self.figure.data), False
+        else:
+            combined = self._combined()
+            if self.figure is None:
+                self.figure = build_sales_figure(combined, aggregate=False)
+                updated, unchanged, rebuilt = len(self.figure.data), 0, True
+            else:
+                updated, unchanged, rebuilt = self._patch_figure(combined)
+        finished = time.perf_counter()
+
+        self.last_report = {
+            'partitions': len(self._partitions),
+            'reaggregated': reaggregated,
+            'skipped': skipped,
+            'removed': removed,
+            'rows_aggregated': rows_aggregated,
+            'rows_skipped': rows_skipped,
+            'traces_updated': updated,
+            'traces_unchanged': unchanged,
+            'figure_rebuilt': rebuilt,
+            'aggregate_s': round(aggregated_at - started, 4),
+            'figure_s': round(finished - aggregated_at, 4),
+        }
+        return self.last_report
+
+
+if __name__ == '__main__':
+    import sys
+
+    from python_demo_0988b1 import df, load_sales
+
+    sales_df = load_sales(sys.argv[1]) if len(sys.argv) > 1 else df
+    dashboard = SalesDashboard()
+    print("First refresh:", dashboard.refresh(sales_df))
+
+    # Simulate new orders arriving for the last month only.
+    last_month = sales_df['Month'].iloc[-1]
+    new_orders = sales_df[sales_df['Month'] == last_month].head(3)
+    updated_df = pd.concat([sales_df, new_orders], ignore_index=True)
+    print("After new orders:", dashboard.refresh(updated_df))
+    print("Nothing changed:", dashboard.refresh(updated_df))
+
+    # Telling the dashboard which partition changed skips fingerprinting the others.
+    updated_df = pd.concat([updated_df, new_orders], ignore_index=True)
+    print("Hinted refresh:", dashboard.refresh(updated_df[updated_df['Month'] == last_month],
+                                               partitions=[last_month]))
+
+# --- Example Usage ---
+#
+#   python sales_dashboard.py sales.parquet
+#
+# Compare 'rows_aggregated' with 'rows_skipped', and 'traces_updated' with
+# 'traces_unchanged', to see how much each refresh avoided.
@@ -0,0 +1,153 @@
+# Learning Objective: Measure whether CPU tricks actually help, instead of guessing.
+#
+# `python_learning_7190d7.py` can run GPT-2 in plain float32 or with dynamic
+# int8 quantization, with an explicit number of CPU threads. This script runs
+# both variants on the same prompts and reports generation speed (tokens/sec),
+# load time, weight size and peak memory, so you can decide which to deploy.
+#
+# Each variant runs in its own freshly spawned process. Peak memory (ru_maxrss)
+# only ever goes up within a process, so measuring two models in one process
+# would attribute the first model's memory to the second.
+
+import argparse
+import json
+import multiprocessing
+import sys
+import time
+from queue import Empty
+
+try:
+    import resource
+except ImportError:  # Not available on Windows; peak memory is then reported as None.
+    resource = None
+
+DEFAULT_PROMPTS = [
+    "The old wizard lived in a crumbling tower.",
+    "A mysterious spaceship landed in the backyard.",
+    "Once upon a time, in a land far away,",
+    "The detective looked at the muddy footprints and",
+]
+
+
+def _peak_rss_bytes():
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak if sys.platform == "darwin" else peak * 1024
+
+
+def run_variant(model_source, quantize, offline, threads, interop_threads, prompts, new_tokens, repeats):
+    """
+    Loads the model once with the given settings and times greedy generation
+    of exactly `new_tokens` tokens for each prompt, `repeats` times.
+    """
+    import python_learning_7190d7 as story
+
+    story.configure_cpu_performance(threads, interop_threads, quantize=quantize)
+    generator = story.get_story_generator(model_source, offline=offline)
+    tokenizer, model = generator.tokenizer, generator.model
+    encoded = [tokenizer(prompt, return_tensors="pt") for prompt in prompts]
+
+    def generate(inputs):
+        with story._inference_mode():
+            # min_new_tokens stops an early end-of-text token from skewing tokens/sec.
+            model.generate(**inputs, max_new_tokens=new_tokens, min_new_tokens=new_tokens,
+                           do_sample=False, pad_token_id=tokenizer.eos_token_id)
+
+    generate(encoded[0])  # Warm-up: the first call pays one-off allocation costs.
+
+    started = time.perf_counter()
+    for _ in range(repeats):
+        for inputs in encoded:
+            generate(inputs)
+    elapsed = time.perf_counter() - started
+    total_tokens = new_tokens * len(encoded) * repeats
+
+    report = story.get_load_report()
+    return {
+        "variant": "int8" if quantize else "fp32",
+        "model": report["model"],
+        "threads": threads,
+        "interop_threads": interop_threads,
+        "load_time_s": report["load_time_s"],
+        "weights_bytes": report["weights_bytes"],
+        "generated_tokens": total_tokens,
+        "elapsed_s": round(elapsed, 3),
+        "tokens_per_s": round(total_tokens / elapsed, 1) if elapsed > 0 else None,
+        "peak_rss_bytes": _peak_rss_bytes(),
+    }
+
+
+def _variant_worker(queue, *args):
+    try:
+        queue.put(run_variant(*args))
+    except Exception as exc:
+        queue.put({"variant": "int8" if args[1] else "fp32", "error": repr(exc)})
+
+
+def run_variant_isolated(*args):
+    """
+    Runs `run_variant` in a new process and returns its result.
+    """
+    context = multiprocessing.get_context("spawn")
+    queue = context.Queue()
+    process = context.Process(target=_variant_worker, args=(queue, *args))
+    process.start()
+    result = None
+    while result is None:
+        try:
+            result = queue.get(timeout=1.0)
+        except Empty:
+            if not process.is_alive():
+                result = {"variant": "int8" if args[1] else "fp32",
+                          "error": f"worker exited with code {process.exitcode}"}
+    process.join()
+    return result
+
+
+def main():
+    import python_learning_7190d7 as story
+
+    parser = argparse.ArgumentParser(description="Compare fp32 and int8 CPU generation speed and memory.")
+    parser.add_argument("--model", default=story.MODEL_SOURCE,
+                        help="Hub name or local directory of a small GPT-2 checkpoint.")
+    parser.add_argument("--offline", action="store_true", help="Never contact the Hugging Face hub.")
+    parser.add_argument("--threads", type=int, help="Intra-op threads (default: PyTorch's choice).")
+    parser.add_argument("--interop-threads", type=int)
+    parser.add_argument("--new-tokens", type=int, default=64)
+    parser.add_argument("--repeats", type=int, default=3)
+    parser.add_argument("--output", help="Also write the results to this JSON file.")
+    args = parser.parse_args()
+
+    results = []
+    for quantize in (False, True):
+        print(f"Benchmarking {'int8' if quantize else 'fp32'}...")
+        results.append(run_variant_isolated(args.model, quantize, args.offline, args.threads,
+                                            args.interop_threads, DEFAULT_PROMPTS, args.new_tokens,
+                                            args.repeats))
+
+    print(f"\n{'variant':<8}{'tokens/s':>12}{'weights MB':>12}{'peak RSS MB':>13}{'load s':>9}")
+    for result in results:
+        if "error" in result:
+            print(f"{result['variant']:<8}  failed: {result['error']}")
+            continue
+        peak_mb = (result["peak_rss_bytes"] or 0) / 2**20
+        print(f"{result['variant']:<8}{result['tokens_per_s']:>12}{result['weights_bytes'] / 2**20:>12.1f}"
+              f"{peak_mb:>13.1f}{result['load_time_s']:>9}")
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as output_file:
+            json.dump(results, output_file, indent=2)
+
+
+if __name__ == "__main__":
+    main()
+
+# --- Example Usage ---
+#
+#   python story_benchmark.py --model gpt2 --offline --threads 4
+#   python story_benchmark.py --model ./my-gpt2-checkpoint --new-tokens 128 --output cpu.json
+#
+# For a quick smoke test without any download, make a tiny model first:
+#   python python_learning_7190d7.py --make-tiny-model /tmp/tiny-gpt2
+#   python story_benchmark.py --model /tmp/tiny-gpt2
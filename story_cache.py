@@ -0,0 +1,170 @@
+# Learning Objective: Avoid re-running an expensive model for requests we have
+# already answered, using a two-tier (memory + disk) result cache.
+#
+# `python_learning_7190d7.py` runs GPT-2 for every prompt, even one submitted a
+# minute ago. This module stores finished results so repeated requests are
+# answered instantly. You will learn to:
+# 1. Build a stable cache key from everything that affects the output.
+# 2. Implement an LRU (least recently used) cache bounded by bytes, not entries.
+# 3. Back it with an on-disk SQLite tier that survives restarts.
+# 4. Count hits and misses so you can tell whether the cache is paying off.
+#
+# Only DETERMINISTIC requests may be cached: a sampled story without a seed is
+# supposed to be different every time, so returning a stored one would be wrong.
+
+import hashlib
+import json
+import sqlite3
+import threading
+from collections import OrderedDict
+
+
+def is_deterministic(seed=None, generate_kwargs=None) -> bool:
+    """
+    Returns True if a request always produces the same output: either it is
+    seeded, or sampling is explicitly turned off (greedy or beam search).
+    """
+    if seed is not None:
+        return True
+    return (generate_kwargs or {}).get("do_sample") is False
+
+
+def make_cache_key(model: str, prompt: str, max_length: int, num_return_sequences: int,
+                   seed=None, generate_kwargs=None) -> str:
+    """
+    Returns a hex digest identifying a request.
+
+    Everything that changes the output goes into the key, including the model,
+    so switching from "gpt2" to a local checkpoint never returns stale stories.
+    Sampling parameters are sorted so {"top_k": 50, "top_p": 0.9} and
+    {"top_p": 0.9, "top_k": 50} give the same key.
+    """
+    key = {
+        "model": model,
+        "prompt": prompt,
+        "max_length": max_length,
+        "num_return_sequences": num_return_sequences,
+        "seed": seed,
+        "generate_kwargs": generate_kwargs or {},
+    }
+    canonical = json.dumps(key, sort_keys=True, separators=(",", ":"), default=repr)
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
+
+class StoryResultCache:
+    """
+    A memory LRU tier bounded by `max_bytes`, optionally backed by a SQLite file.
+
+    Values must be JSON-serializable (generate_story's list of dicts is). The
+    size of an entry is the length of its JSON encoding, which is a good proxy
+    for the memory a list of strings takes.
+
+    Lookups check memory first, then disk; a disk hit is promoted into memory.
+    Evicting from memory does not remove the entry from disk.
+    """
+
+    def __init__(self, max_bytes: int = 64 * 2**20, disk_path: str = None):
+        self.max_bytes = max_bytes
+        self.disk_path = disk_path
+        self._entries = OrderedDict()  # key -> (json_text, size); last = most recent
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.memory_hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.uncacheable = 0
+
+        self._db = None
+        if disk_path:
+            self._db = sqlite3.connect(disk_path, check_same_thread=False)
+            self._db.execute("CREATE TABLE IF NOT EXISTS results (key TEXT PRIMARY KEY, value TEXT NOT NULL)")
+            self._db.commit()
+
+    def _remember(self, key: str, text: str) -> None:
+        # Caller holds the lock.
+        size = len(text)
+        if key in self._entries:
+            self._bytes -= self._entries.pop(key)[1]
+        if size > self.max_bytes:
+            return  # Would evict everything else; keep it on disk only.
+        self._entries[key] = (text, size)
+        self._bytes += size
+        while self._bytes > self.max_bytes:
+            _, (_, evicted_size) = self._entries.popitem(last=False)
+            self._bytes -= evicted_size
+            self.evictions += 1
+
+    def get(self, key: str):
+        """
+        Returns the cached value for `key`, or None on a miss.
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+                self.memory_hits += 1
+                return json.loads(entry[0])
+
+            if self._db is not None:
+                row = self._db.execute("SELECT value FROM results WHERE key = ?", (key,)).fetchone()
+                if row is not None:
+                    self.disk_hits += 1
+                    self._remember(key, row[0])
+                    return json.loads(row[0])
+
+            self.misses += 1
+            return None
+
+    def put(self, key: str, value) -> None:
+        """
+        Stores `value` in memory and, if enabled, on disk.
+        """
+        text = json.dumps(value)
+        with self._lock:
+            self._remember(key, text)
+            if self._db is not None:
+                self._db.execute("INSERT OR REPLACE INTO results (key, value) VALUES (?, ?)", (key, text))
+                self._db.commit()
+
+    def note_uncacheable(self) -> None:
+        """
+        Counts a request that bypassed the cache because it was not deterministic.
+        """
+        with self._lock:
+            self.uncacheable += 1
+
+    def clear(self) -> None:
+        """
+        Empties both tiers (counters are kept).
+        """
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+            if self._db is not None:
+                self._db.execute("DELETE FROM results")
+                self._db.commit()
+
+    def close(self) -> None:
+        if self._db is not None:
+            self._db.close()
+            self._db = None
+
+    def stats(self) -> dict:
+        """
+        Returns hit/miss counters and current memory usage.
+        """
+        with self._lock:
+            lookups = self.memory_hits + self.disk_hits + self.misses
+            return {
+                "memory_hits": self.memory_hits,
+                "disk_hits": self.disk_hits,
+                "misses": self.misses,
+                "hit_rate": round((self.memory_hits + self.disk_hits) / lookups, 4) if lookups else 0.0,
+                "evictions": self.evictions,
+                "uncacheable": self.uncacheable,
+                "memory_entries": len(self._entries),
+                "memory_bytes": self._bytes,
+                "max_bytes": self.max_bytes,
+                "disk_path": self.disk_path,
+            }
@@ -0,0 +1,213 @@
+# Learning Objective: Use every CPU core for story generation without loading
+# the model once per core.
+#
+# One Python process running GPT-2 keeps only a few cores busy. Starting N
+# independent processes would work, but each would load (and hold) its own
+# copy of the weights. Instead we load the model ONCE in the parent and then
+# `fork()` the workers. After a fork, parent and children share the same
+# physical memory pages; a page is only copied when someone writes to it
+# ("copy-on-write"). Model weights are only ever read during generation, so
+# all workers keep sharing a single copy.
+#
+# You will learn to:
+# 1. Prepare a parent process for forking (load first, freeze the GC).
+# 2. Apply backpressure so a huge input never piles up in memory.
+# 3. Return results in submission order even though workers finish out of order.
+#
+# fork() is available on Linux and macOS, not on Windows.
+
+import gc
+import itertools
+import multiprocessing
+import os
+import threading
+import traceback
+from queue import Empty
+
+import python_learning_7190d7 as story
+
+
+def _worker_main(task_queue, result_queue, threads_per_worker, worker_seed):
+    """
+    Runs in each forked worker: takes batches off the queue until told to stop.
+    """
+    import torch
+    from transformers import set_seed
+
+    # A forked worker inherits the parent's random state, so without this every
+    # worker would sample its batches from the very same random stream.
+    set_seed(worker_seed)
+
+    # Every worker would otherwise start one thread per core, and N workers
+    # fighting over the same cores is slower than no parallelism at all.
+    torch.set_num_threads(threads_per_worker)
+    while True:
+        task = task_queue.get()
+        if task is None:
+            break
+        run_id, seq, batch, max_length, num_return_sequences, generate_kwargs = task
+        try:
+            results, stats = story.generate_token_batch(batch, max_length, num_return_sequences,
+                                                        **generate_kwargs)
+            result_queue.put(("ok", run_id, seq, (results, stats)))
+        except Exception:
+            result_queue.put(("error", run_id, seq, traceback.format_exc()))
+
+
+class StoryWorkerPool:
+    """
+    A pool of forked processes that generate stories with a shared model.
+
+    Use it as a context manager:
+
+        with StoryWorkerPool(workers=4) as pool:
+            for results, stats in pool.iter_batches(prompts, batch_size=8):
+                ...
+
+    `iter_batches` accepts the same arguments as iter_story_batches and yields
+    the same (results, stats) pairs, in the order the batches were submitted.
+    At most `max_in_flight` batches are queued, running or waiting to be
+    yielded at any time, so reading a huge (or endless) prompt iterator stays
+    within bounded memory. One iteration at a time per pool.
+    """
+
+    def __init__(self, workers=None, threads_per_worker=1, max_in_flight=None, seed=None):
+        if "fork" not in multiprocessing.get_all_start_methods():
+            raise RuntimeError("StoryWorkerPool needs the 'fork' start method, which this platform lacks.")
+        self.workers = workers or os.cpu_count() or 1
+        self.threads_per_worker = threads_per_worker
+        self.max_in_flight = max_in_flight or 2 * self.workers
+        # Worker i is seeded with seed + i; without a seed, each gets a random one.
+        self.seed = seed
+        self._context = multiprocessing.get_context("fork")
+        self._task_queue = None
+        self._result_queue = None
+        self._processes = []
+        self._run_ids = itertools.count()
+
+    def start(self):
+        """
+        Loads the model in this process and forks the workers.
+        """
+        if self._processes:
+            return self
+        # 1. Load everything the workers need BEFORE forking, so they inherit it.
+        story.get_story_generator()
+        self._task_queue = self._context.Queue()
+        self._result_queue = self._context.Queue()
+
+        # 2. The garbage collector writes to every object it scans, which would
+        #    copy the pages holding them into each worker. gc.freeze() moves all
+        #    current objects into a generation the collector never scans.
+        gc.collect()
+        gc.freeze()
+
+        for worker_index in range(self.workers):
+            if self.seed is None:
+                worker_seed = int.from_bytes(os.urandom(4), "little")
+            else:
+                worker_seed = (self.seed + worker_index) % 2**32
+            process = self._context.Process(
+                target=_worker_main,
+                args=(self._task_queue, self._result_queue, self.threads_per_worker, worker_seed),
+                daemon=True,
+            )
+            process.start()
+            self._processes.append(process)
+        return self
+
+    def close(self):
+        """
+        Stops the workers and waits for them to exit.
+        """
+        for _ in self._processes:
+            self._task_queue.put(None)
+        for process in self._processes:
+            process.join()
+        self._processes = []
+        gc.unfreeze()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def _check_workers(self):
+        for process in self._processes:
+            if not process.is_alive():
+                raise RuntimeError(f"A story worker died unexpectedly (exit code {process.exitcode}).")
+
+    def iter_batches(self, prompts, batch_size=8, max_length=150, num_return_sequences=1,
+                     bucket_window=16, **generate_kwargs):
+        """
+        Like iter_story_batches, but runs the batches in the worker processes.
+        """
+        self.start()
+        run_id = next(self._run_ids)
+        tokenizer = story.get_story_generator().tokenizer
+        generate_kwargs.setdefault("do_sample", True)
+        slots = threading.Semaphore(self.max_in_flight)
+        stop = threading.Event()
+        submitted = {"count": None, "error": None}
+
+        # The feeder thread tokenizes and submits batches, blocking on `slots`
+        # whenever max_in_flight batches are outstanding: that is the backpressure.
+        def feed():
+            count = 0
+            try:
+                for batch in story._token_batches(tokenizer, prompts, batch_size, bucket_window):
+                    slots.acquire()
+                    if stop.is_set():
+                        return
+                    self._task_queue.put((run_id, count, batch, max_length, num_return_sequences,
+                                          generate_kwargs))
+                    count += 1
+            except Exception as exc:
+                submitted["error"] = exc
+            finally:
+                submitted["count"] = count
+                self._result_queue.put(("fed", run_id, None, None))
+
+        feeder = threading.Thread(target=feed, daemon=True)
+        feeder.start()
+
+        pending = {}
+        next_seq = 0
+        try:
+            while submitted["count"] is None or next_seq < submitted["count"]:
+                if next_seq in pending:
+                    yield pending.pop(next_seq)
+                    next_seq += 1
+                    slots.release()
+                    continue
+                try:
+                    kind, result_run_id, seq, payload = self._result_queue.get(timeout=1.0)
+                except Empty:
+                    self._check_workers()
+                    continue
+                if result_run_id != run_id:
+                    continue  # Left over from an iteration that was abandoned early.
+                if kind == "error":
+                    raise RuntimeError(f"Story worker failed on batch {seq}:\n{payload}")
+                if kind == "ok":
+                    pending[seq] = payload
+            if submitted["error"] is not None:
+                raise submitted["error"]
+        finally:
+            # If the caller stopped early, unblock the feeder so it can exit.
+            stop.set()
+            slots.release()
+            feeder.join()
+
+    def map(self, prompts, batch_size=8, max_length=150, num_return_sequences=1, **generate_kwargs):
+        """
+        Returns one list of stories per prompt, in the same order as `prompts`.
+        """
+        prompts = list(prompts)
+        ordered = [None] * len(prompts)
+        for results, _ in self.iter_batches(prompts, batch_size, max_length, num_return_sequences,
+                                            **generate_kwargs):
+            for index, _, generated_texts in results:
+                ordered[index] = generated_texts
+        return ordered
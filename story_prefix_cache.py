@@ -0,0 +1,112 @@
+# Learning Objective: Reuse the model's work on a shared prompt preamble
+# instead of recomputing it for every story.
+#
+# When GPT-2 reads a prompt, every layer computes "key" and "value" tensors for
+# every token (the KV cache). Generation then only needs those tensors plus the
+# newest token. If thousands of prompts start with the same long preamble
+# (style instructions, a setting, ...), the preamble's keys and values are the
+# same every time, so we compute them once, keep them, and let generation
+# resume from there. Only the novel part of each prompt is processed.
+#
+# You will learn to:
+# 1. Measure how much memory a KV cache takes.
+# 2. Keep an LRU cache bounded by memory footprint rather than entry count.
+# 3. Hand out private copies, because generation appends to the cache it is given.
+
+import copy
+import threading
+from collections import OrderedDict
+
+
+def cache_nbytes(past_key_values) -> int:
+    """
+    Returns the number of bytes held by the key/value tensors of a cache.
+
+    Works for transformers' Cache objects (which keep per-layer `keys` and
+    `values`) and for the older tuple-of-tuples format.
+    """
+    layers = getattr(past_key_values, "layers", None)
+    if layers is not None:
+        tensors = [t for layer in layers for t in (layer.keys, layer.values) if t is not None]
+    else:
+        tensors = [t for layer in past_key_values for t in layer]
+    return sum(t.numel() * t.element_size() for t in tensors)
+
+
+class PrefixKVCache:
+    """
+    Maps a prompt prefix (model name + token ids) to its precomputed KV cache.
+
+    Entries are evicted least-recently-used first whenever the total tensor
+    memory would exceed `max_bytes`. `get` returns a deep copy, so callers can
+    let `model.generate` extend it without corrupting the stored entry.
+    """
+
+    def __init__(self, max_bytes: int = 256 * 2**20):
+        self.max_bytes = max_bytes
+        self._entries = OrderedDict()  # key -> (past_key_values, nbytes, prefix_tokens)
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.tokens_reused = 0
+
+    @staticmethod
+    def make_key(model: str, prefix_ids) -> tuple:
+        return (model, tuple(prefix_ids))
+
+    def get(self, key: tuple):
+        """
+        Returns a private copy of the cached KV state for `key`, or None.
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            self.tokens_reused += entry[2]
+            past_key_values = entry[0]
+        # Copy outside the lock: it is the slow part, and the stored entry is never mutated.
+        return copy.deepcopy(past_key_values)
+
+    def put(self, key: tuple, past_key_values, prefix_tokens: int) -> None:
+        """
+        Stores `past_key_values` (which must not be modified afterwards).
+        """
+        nbytes = cache_nbytes(past_key_values)
+        if nbytes > self.max_bytes:
+            return
+        with self._lock:
+            if key in self._entries:
+                self._bytes -= self._entries.pop(key)[1]
+            self._entries[key] = (past_key_values, nbytes, prefix_tokens)
+            self._bytes += nbytes
+            while self._bytes > self.max_bytes:
+                _, (_, evicted_bytes, _) = self._entries.popitem(last=False)
+                self._bytes -= evicted_bytes
+                self.evictions += 1
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    def stats(self) -> dict:
+        """
+        Returns hit/miss counters, tokens whose computation was skipped, and memory use.
+        """
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+                "tokens_reused": self.tokens_reused,
+                "evictions": self.evictions,
+                "entries": len(self._entries),
+                "bytes": self._bytes,
+                "max_bytes": self.max_bytes,
+            }
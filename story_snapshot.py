@@ -0,0 +1,271 @@
+# Learning Objective: Make the story generator start in milliseconds by
+# memory-mapping its weights instead of deserializing them.
+#
+# A normal `from_pretrained` call builds the model with freshly allocated
+# (randomly initialized) weights and then copies every tensor from disk into
+# them. For GPT-2 that is ~500 MB of reading and copying before the first story.
+#
+# A memory map (mmap) asks the operating system to make a file *look like*
+# memory. Nothing is read up front; each 4 KB page is loaded the first time it
+# is touched. Better still, the pages live in the OS page cache, so a second
+# process mapping the same file shares them instead of loading its own copy,
+# and a restarted service finds them still cached.
+#
+# The snapshot is a directory holding the config, the tokenizer and the weights
+# in the safetensors format: a small JSON header followed by the raw tensor
+# bytes. Raw bytes are exactly what we need, because a tensor can then point
+# straight at the mapped file (torch.frombuffer) without any copying.
+# (The directory is also a normal checkpoint, so from_pretrained can read it.)
+#
+# You will learn to:
+# 1. Build a model "skeleton" on the meta device (shapes only, no memory).
+# 2. Attach memory-mapped tensors to it without copying.
+# 3. Measure cold (nothing cached) and warm (page cache hot) start-up times.
+
+import argparse
+import itertools
+import json
+import mmap
+import multiprocessing
+import os
+import struct
+import time
+from queue import Empty
+
+SNAPSHOT_MARKER = "story_snapshot.json"
+WEIGHTS_FILE = "model.safetensors"
+
+# safetensors dtype names -> torch dtype attribute names.
+_DTYPES = {
+    "F64": "float64", "F32": "float32", "F16": "float16", "BF16": "bfloat16",
+    "I64": "int64", "I32": "int32", "I16": "int16", "I8": "int8", "U8": "uint8", "BOOL": "bool",
+}
+
+
+def is_snapshot(path) -> bool:
+    """
+    Returns True if `path` is a directory written by save_snapshot.
+    """
+    return os.path.isfile(os.path.join(path, SNAPSHOT_MARKER))
+
+
+def save_snapshot(model, tokenizer, path, source=None):
+    """
+    Writes `model` and `tokenizer` to `path` in the mmap-friendly snapshot layout.
+    """
+    import torch
+    from safetensors.torch import save_file
+
+    os.makedirs(path, exist_ok=True)
+    model.config.save_pretrained(path)
+    if getattr(model, "generation_config", None) is not None:
+        model.generation_config.save_pretrained(path)
+    tokenizer.save_pretrained(path)
+
+    # Tied weights (GPT-2's output layer reuses the input embedding) appear
+    # twice in the state dict but share storage; save each storage only once.
+    tensors = {}
+    seen = set()
+    for name, tensor in model.state_dict().items():
+        if tensor.data_ptr() in seen:
+            continue
+        seen.add(tensor.data_ptr())
+        tensors[name] = tensor.detach().to("cpu").contiguous()
+    save_file(tensors, os.path.join(path, WEIGHTS_FILE), metadata={"format": "pt"})
+
+    with open(os.path.join(path, SNAPSHOT_MARKER), "w", encoding="utf-8") as marker:
+        json.dump({"format": "story-snapshot", "version": 1, "weights": WEIGHTS_FILE,
+                   "source": source, "torch": torch.__version__}, marker, indent=2)
+    return path
+
+
+def mmap_state_dict(weights_path):
+    """
+    Returns ({name: tensor}, mmap) where every tensor is a zero-copy view into
+    the memory-mapped safetensors file. Keep the mmap object alive as long as
+    the tensors are in use.
+    """
+    import warnings
+
+    import torch
+
+    with open(weights_path, "rb") as weights_file:
+        (header_size,) = struct.unpack("<Q", weights_file.read(8))
+        header = json.loads(weights_file.read(header_size))
+        # ACCESS_COPY is a private mapping: pages are shared with the page cache
+        # (and so with other processes) until someone writes to them.
+        mapped = mmap.mmap(weights_file.fileno(), 0, access=mmap.ACCESS_COPY)
+
+    data_start = 8 + header_size
+    state_dict = {}
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore")  # frombuffer warns that the result shares memory.
+        for name, info in header.items():
+            if name == "__metadata__":
+                continue
+            dtype = getattr(torch, _DTYPES[info["dtype"]])
+            start, end = info["data_offsets"]
+            count = (end - start) // torch.empty((), dtype=dtype).element_size()
+            tensor = torch.frombuffer(mapped, dtype=dtype, count=count, offset=data_start + start)
+            state_dict[name] = tensor.view(info["shape"])
+    return state_dict, mapped
+
+
+def load_snapshot_model(path):
+    """
+    Builds the model described by the snapshot at `path` on top of mmap'd weights.
+    """
+    import torch
+    from transformers import AutoConfig, AutoModelForCausalLM
+
+    config = AutoConfig.from_pretrained(path, local_files_only=True)
+    # On the "meta" device modules get shapes but no storage, so building the
+    # skeleton costs nothing. assign=True then makes each parameter *be* our
+    # mapped tensor instead of copying into it.
+    with torch.device("meta"):
+        model = AutoModelForCausalLM.from_config(config)
+    state_dict, mapped = mmap_state_dict(os.path.join(path, WEIGHTS_FILE))
+    model.load_state_dict(state_dict, strict=False, assign=True)
+    model.tie_weights()
+
+    missing = [name for name, tensor in itertools.chain(model.named_parameters(), model.named_buffers())
+               if tensor.device.type == "meta"]
+    if missing:
+        raise ValueError(f"Snapshot at {path} has no data for: {', '.join(missing[:5])}")
+
+    model.requires_grad_(False)
+    model.eval()
+    model._snapshot_mmap = mapped  # Keeps the mapping open for the model's lifetime.
+    return model
+
+
+# --- Measuring Start-up Time ---
+
+def evict_from_page_cache(path):
+    """
+    Asks the OS to drop the cached pages of every file under `path`, so the
+    next load has to read from disk ("cold start"). Linux only; a no-op elsewhere.
+    """
+    if not hasattr(os, "posix_fadvise"):
+        return False
+    for root, _, files in os.walk(path):
+        for name in files:
+            fd = os.open(os.path.join(root, name), os.O_RDONLY)
+            try:
+                os.posix_fadvise(fd, 0, 0, os.POSIX_FADV_DONTNEED)
+            finally:
+                os.close(fd)
+    return True
+
+
+def _measure_startup(model_source):
+    """
+    Runs in a fresh process: loads the generator and produces one token.
+    """
+    started = time.perf_counter()
+    import python_learning_7190d7 as story
+
+    story.get_story_generator(model_source, offline=True)
+    loaded = time.perf_counter()
+    generator = story.get_story_generator()
+    inputs = generator.tokenizer("Once upon a time", return_tensors="pt")
+    with story._inference_mode():
+        generator.model.generate(**inputs, max_new_tokens=1, pad_token_id=generator.tokenizer.eos_token_id)
+    first_token = time.perf_counter()
+
+    report = story.get_load_report()
+    return {
+        "model": model_source,
+        "process_to_loaded_s": round(loaded - started, 3),
+        "load_time_s": report["load_time_s"],
+        "first_token_after_load_s": round(first_token - loaded, 3),
+        "rss_delta_bytes": report["rss_delta_bytes"],
+    }
+
+
+def _startup_worker(queue, model_source):
+    try:
+        queue.put(_measure_startup(model_source))
+    except Exception as exc:
+        queue.put({"model": model_source, "error": repr(exc)})
+
+
+def measure_startup_isolated(model_source):
+    context = multiprocessing.get_context("spawn")
+    queue = context.Queue()
+    process = context.Process(target=_startup_worker, args=(queue, model_source))
+    process.start()
+    result = None
+    while result is None:
+        try:
+            result = queue.get(timeout=1.0)
+        except Empty:
+            if not process.is_alive():
+                result = {"model": model_source, "error": f"worker exited with code {process.exitcode}"}
+    process.join()
+    return result
+
+
+def compare_startup(checkpoint_dir, snapshot_dir):
+    """
+    Measures cold and warm start-up for the regular checkpoint and the snapshot.
+    """
+    results = []
+    for label, path in (("from_pretrained", checkpoint_dir), ("mmap snapshot", snapshot_dir)):
+        for temperature in ("cold", "warm"):
+            if temperature == "cold":
+                evict_from_page_cache(path)
+            result = measure_startup_isolated(path)
+            result.update({"loader": label, "start": temperature})
+            results.append(result)
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Create and benchmark mmap-backed story model snapshots.")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    save_cmd = commands.add_parser("save", help="Write a snapshot of a model.")
+    save_cmd.add_argument("--model", required=True, help="Hub name or local checkpoint directory.")
+    save_cmd.add_argument("--offline", action="store_true")
+    save_cmd.add_argument("--out", required=True, help="Directory for the snapshot.")
+
+    measure_cmd = commands.add_parser("measure", help="Compare cold/warm start-up times.")
+    measure_cmd.add_argument("--checkpoint", required=True, help="A regular local checkpoint directory.")
+    measure_cmd.add_argument("--snapshot", required=True, help="A snapshot directory made by 'save'.")
+    measure_cmd.add_argument("--output", help="Also write the results to this JSON file.")
+    args = parser.parse_args()
+
+    if args.command == "save":
+        import python_learning_7190d7 as story
+
+        generator = story.load_story_generator(args.model, offline=args.offline)
+        save_snapshot(generator.model, generator.tokenizer, args.out, source=args.model)
+        print(f"Snapshot written to {args.out}")
+    elif args.command == "measure":
+        results = compare_startup(args.checkpoint, args.snapshot)
+        print(f"\n{'loader':<18}{'start':<7}{'load s':>9}{'1st token s':>13}{'process s':>11}{'RSS +MB':>10}")
+        for result in results:
+            if "error" in result:
+                print(f"{result['loader']:<18}{result['start']:<7}  failed: {result['error']}")
+                continue
+            print(f"{result['loader']:<18}{result['start']:<7}{result['load_time_s']:>9}"
+                  f"{result['first_token_after_load_s']:>13}{result['process_to_loaded_s']:>11}"
+                  f"{(result['rss_delta_bytes'] or 0) / 2**20:>10.1f}")
+        if args.output:
+            with open(args.output, "w", encoding="utf-8") as output_file:
+                json.dump(results, output_file, indent=2)
+
+
+if __name__ == "__main__":
+    main()
+
+# --- Example Usage ---
+#
+#   python story_snapshot.py save --model gpt2 --out ./gpt2-snapshot
+#   python python_learning_7190d7.py --model ./gpt2-snapshot --prompt "The old wizard"
+#   python story_snapshot.py measure --checkpoint ./gpt2-checkpoint --snapshot ./gpt2-snapshot
+#
+# Loading is near-instant; the first token pays for paging in the weights it
+# touches, which is why the measurement reports both numbers. Cold runs drop
+# the files from the page cache first (Linux), warm runs follow immediately.
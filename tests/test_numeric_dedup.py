@@ -0,0 +1,151 @@
+"""
+Equivalence tests: the NumPy fast path must return exactly what the generic
+set + sorted() path of Solution.process_data returns.
+"""
+
+import glob
+import importlib.util
+import math
+import os
+import random
+import sys
+
+import pytest
+
+np = pytest.importorskip('numpy')
+
+CHALLENGES = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'challenges')
+sys.path.insert(0, CHALLENGES)
+
+import _numeric_dedup as numeric_dedup  # noqa: E402
+
+SIZE = 2 * numeric_dedup.NUMPY_MIN_SIZE
+
+
+def generic(data):
+    """
+    The generic process_data path: the first of equal items is kept, then sorted.
+    """
+    result = []
+    seen = set()
+    for item in data:
+        if item not in seen:
+            seen.add(item)
+            result.append(item)
+    return sorted(result)
+
+
+def load_solutions():
+    solutions = []
+    for path in sorted(glob.glob(os.path.join(CHALLENGES, 'challenge_2026_*.py'))):
+        name = 'challenge_test_' + os.path.splitext(os.path.basename(path))[0]
+        spec = importlib.util.spec_from_file_location(name, path)
+        module = importlib.util.module_from_spec(spec)
+        spec.loader.exec_module(module)
+        solutions.append(pytest.param(module.Solution(), id=os.path.basename(path)))
+    return solutions
+
+
+def assert_same(actual, expected):
+    assert len(actual) == len(expected)
+    for left, right in zip(actual, expected):
+        assert type(left) is type(right)
+        if isinstance(left, float) and math.isnan(left):
+            assert math.isnan(right)
+        else:
+            assert left == right
+            if isinstance(left, float):
+                assert math.copysign(1, left) == math.copysign(1, right)
+
+
+rng = random.Random(0)
+FAST_INPUTS = {
+    'small_span_ints': [rng.randrange(-50, 50) for _ in range(SIZE)],
+    'wide_span_ints': [rng.randrange(-2**62, 2**62) for _ in range(SIZE)],
+    'int64_extremes': [-2**63, 2**63 - 1, 0] * (SIZE // 3),
+    'floats': [rng.uniform(-1e6, 1e6) for _ in range(SIZE // 2)] * 2,
+    'negative_zeros_only': [-0.0, 1.5, -2.5] * (SIZE // 3),
+    'tuple': tuple(rng.randrange(SIZE) for _ in range(SIZE)),
+}
+FALLBACK_INPUTS = {
+    'nan': [1.0, float('nan'), 2.0] * (SIZE // 3),
+    'mixed_zeros': [0.0, -0.0, 1.0] * (SIZE // 3),
+    'mixed_zeros_negative_first': [-0.0, 0.0, 1.0] * (SIZE // 3),
+    'bools': [True, False] * (SIZE // 2),
+    'ints_and_bools': [1, True, 0, False] * (SIZE // 4),
+    'ints_and_floats': [1, 1.0, 2, 0.5] * (SIZE // 4),
+    'huge_ints': [2**64, 1, -2**70] * (SIZE // 3),
+    'strings': [str(rng.randrange(100)) for _ in range(SIZE)],
+    'too_small': list(range(numeric_dedup.NUMPY_MIN_SIZE - 1, 0, -1)),
+}
+
+
+@pytest.mark.parametrize('name', sorted(FAST_INPUTS))
+def test_fast_path_matches_generic(name):
+    data = FAST_INPUTS[name]
+    result = numeric_dedup.process_numeric(data)
+    assert result is not None
+    assert_same(result, generic(data))
+
+
+@pytest.mark.parametrize('name', sorted(FALLBACK_INPUTS))
+def test_ambiguous_or_unsupported_inputs_fall_back(name):
+    assert numeric_dedup.process_numeric(FALLBACK_INPUTS[name]) is None
+
+
+@pytest.mark.parametrize('dtype', ['int8', 'int16', 'int32', 'int64', 'uint8', 'uint16', 'uint32', 'uint64'])
+def test_integer_dtype_extremes(dtype):
+    info = np.iinfo(dtype)
+    # Near the top and the bottom of the range, so offsets wrap around.
+    for low in (int(info.min), int(info.max) - 200):
+        values = np.array([low + rng.randrange(201) for _ in range(SIZE)] + [low, low + 200], dtype=dtype)
+        expected = generic(values)
+        assert_same(numeric_dedup.process_numeric(values), expected)
+        span = int(values.max()) - int(values.min()) + 1
+        assert np.array_equal(numeric_dedup.unique_bitmap(values, int(values.min()), span),
+                              numeric_dedup.unique_sorted(values))
+    full_range = np.array([info.min, info.max, 0] * (SIZE // 3), dtype=dtype)
+    assert_same(numeric_dedup.process_numeric(full_range), generic(full_range))
+
+
+@pytest.mark.parametrize('dtype', ['float32', 'float64'])
+def test_float_arrays(dtype):
+    values = np.array([rng.uniform(-5, 5) for _ in range(SIZE // 2)] * 2, dtype=dtype)
+    assert_same(numeric_dedup.process_numeric(values), generic(values))
+    values[3] = np.nan
+    assert numeric_dedup.process_numeric(values) is None
+
+
+def test_unsupported_arrays_fall_back():
+    assert numeric_dedup.process_numeric(np.ones((SIZE, 2))) is None
+    assert numeric_dedup.process_numeric(np.array([True, False] * SIZE)) is None
+    assert numeric_dedup.process_numeric(np.array(['a', 'b'] * SIZE)) is None
+
+
+@pytest.mark.parametrize('solution', load_solutions())
+@pytest.mark.parametrize('name', sorted(FAST_INPUTS) + sorted(FALLBACK_INPUTS))
+def test_process_data_matches_generic(solution, name):
+    data = {**FAST_INPUTS, **FALLBACK_INPUTS}[name]
+    assert_same(solution.process_data(data), generic(data))
+
+
+def test_parallel_dedup_matches_generic():
+    parallel_dedup = pytest.importorskip('parallel_dedup')
+    for name in ('small_span_ints', 'wide_span_ints', 'floats', 'strings'):
+        data = FAST_INPUTS.get(name) or FALLBACK_INPUTS[name]
+        assert_same(parallel_dedup.process_data_parallel(data, workers=1), generic(data))
+
+
+@pytest.mark.parametrize('name', ['small_span_ints', 'floats', 'mixed_zeros', 'ints_and_floats', 'strings'])
+def test_incremental_and_external_dedup_match_generic(name, tmp_path):
+    from external_dedup import process_data_external
+    from sorted_unique_list import SortedUniqueList
+
+    data = {**FAST_INPUTS, **FALLBACK_INPUTS}[name]
+    expected = generic(data)
+    collection = SortedUniqueList(load=16)
+    for start in range(0, len(data), 97):
+        collection.add_many(data[start:start + 97])
+    assert_same(list(collection), expected)
+    # A tiny memory budget forces several run files and a real merge.
+    assert_same(list(process_data_external(data, memory_budget=4096, temp_dir=str(tmp_path))), expected)
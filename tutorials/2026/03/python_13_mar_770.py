@@ -2,6 +2,7 @@
 # ===========================
 
 import hashlib
+from collections import deque
 
 def calculate_hash(string):
     """
@@ -46,6 +47,152 @@ def calculate_rabin_karp_hash(string, d):
     
     return hash_value
 
+# Rolling hashes
+# ==============
+# calculate_rabin_karp_hash adds up ord(char) * 31**i for every position i.
+# Sliding a window one character to the right does not need all of that again:
+#
+# - append(char): add ord(char) * 31**len (the new last position).
+# - popleft():    subtract the first character (which has power 31**0), then
+#                 divide everything by 31 so the remaining powers shift down.
+#                 "Divide" modulo a prime d means multiplying by the modular
+#                 inverse of 31, pow(31, -1, d).
+#
+# Both are O(1), whatever the window length. With a single modulus near 10**9,
+# two different windows share a hash about once in 10**9 comparisons, which a
+# long text easily reaches. RollingHash therefore keeps two hashes with two
+# different prime moduli; a false match then needs both to collide at once.
+
+RABIN_KARP_BASE = 31
+RABIN_KARP_MODULI = (1_000_000_007, 998_244_353)
+
+class RollingHash:
+    """
+    The Rabin-Karp hash of a window of text that can grow, shrink and slide.
+
+    Its value is a tuple with calculate_rabin_karp_hash(window, d) for each
+    modulus d, so it always agrees with the function above.
+
+    Parameters:
+    text (str): Optional initial window contents.
+    moduli (tuple): Prime moduli, one hash per modulus.
+    """
+
+    def __init__(self, text="", moduli=RABIN_KARP_MODULI):
+        self.moduli = tuple(moduli)
+        self._inverses = tuple(pow(RABIN_KARP_BASE, -1, d) for d in self.moduli)
+        self._hashes = [0] * len(self.moduli)
+        # self._powers[k] == 31**len(window) % moduli[k]: the weight of the next appended character.
+        self._powers = [1] * len(self.moduli)
+        self._window = deque()
+        for char in text:
+            self.append(char)
+
+    def __len__(self):
+        return len(self._window)
+
+    @property
+    def value(self):
+        return tuple(self._hashes)
+
+    def text(self):
+        """
+        Returns the characters currently in the window.
+        """
+        return "".join(self._window)
+
+    def append(self, char):
+        """
+        Adds a character at the right end of the window.
+        """
+        code = ord(char)
+        for k, d in enumerate(self.moduli):
+            self._hashes[k] = (self._hashes[k] + code * self._powers[k]) % d
+            self._powers[k] = (self._powers[k] * RABIN_KARP_BASE) % d
+        self._window.append(char)
+
+    def popleft(self):
+        """
+        Removes and returns the character at the left end of the window.
+        """
+        char = self._window.popleft()
+        code = ord(char)
+        for k, d in enumerate(self.moduli):
+            self._hashes[k] = ((self._hashes[k] - code) * self._inverses[k]) % d
+            self._powers[k] = (self._powers[k] * self._inverses[k]) % d
+        return char
+
+    def slide(self, char):
+        """
+        Moves a fixed-size window one character right: appends `char`, drops
+        the first character and returns it.
+        """
+        self.append(char)
+        return self.popleft()
+
+def iter_rabin_karp_matches(chunks, patterns, moduli=RABIN_KARP_MODULI):
+    """
+    Finds every occurrence of the patterns in a text that arrives in pieces.
+
+    Parameters:
+    chunks (iterable of str): The text, in pieces of any size (a file, a socket, ...).
+    patterns (list of str): Non-empty patterns, all of the same length.
+    moduli (tuple): Prime moduli for the rolling hash.
+
+    Yields:
+    tuple: (position, pattern) for each match, in order of position.
+    Matches that span two chunks are found too.
+    """
+    patterns = list(dict.fromkeys(patterns))
+    length = len(patterns[0]) if patterns else 0
+    if length == 0 or any(len(pattern) != length for pattern in patterns):
+        raise ValueError("patterns must be non-empty and all of the same length")
+
+    # Several patterns cost no more than one: their hashes go in a dictionary,
+    # and every window is looked up in it.
+    targets = {}
+    for pattern in patterns:
+        key = tuple(calculate_rabin_karp_hash(pattern, d) for d in moduli)
+        targets.setdefault(key, []).append(pattern)
+
+    window = RollingHash(moduli=moduli)
+    position = 0
+    for chunk in chunks:
+        for char in chunk:
+            if len(window) == length:
+                window.slide(char)
+            else:
+                window.append(char)
+            position += 1
+            if len(window) == length:
+                candidates = targets.get(window.value)
+                if candidates:
+                    # Equal hashes almost always mean equal text; checking makes it certain.
+                    window_text = window.text()
+                    for pattern in candidates:
+                        if pattern == window_text:
+                            yield position - length, pattern
+
+def rabin_karp_search(text, patterns, moduli=RABIN_KARP_MODULI):
+    """
+    Finds all match positions of one pattern, or of several equal-length patterns.
+
+    Parameters:
+    text (str or iterable of str): The text to search, whole or in chunks.
+    patterns (str or list of str): One pattern, or several of the same length.
+
+    Returns:
+    list or dict: For one pattern, the list of positions where it occurs.
+    For a list of patterns, a dict mapping each pattern to its positions.
+    """
+    chunks = [text] if isinstance(text, str) else text
+    if isinstance(patterns, str):
+        return [position for position, _ in iter_rabin_karp_matches(chunks, [patterns], moduli)]
+    found = {pattern: [] for pattern in patterns}
+    for position, pattern in iter_rabin_karp_matches(chunks, patterns, moduli):
+        found[pattern].append(position)
+    return found
+
 def calculate_jenkins_hash(string):
     """
     Calculate the Jenkins hash of a given string.
@@ -83,7 +230,20 @@ if __name__ == "__main__":
     # Test the Rabin-Karp hash function
     print("\nRabin-Karp Hash:")
     print(calculate_rabin_karp_hash("Hello, World!", 1000007))
+
+    # Slide a rolling hash along a string: it always equals a fresh hash of the window
+    print("\nRolling Hash:")
+    window = RollingHash("Hello")
+    for char in ", World!":
+        window.slide(char)
+        assert window.value[0] == calculate_rabin_karp_hash(window.text(), RABIN_KARP_MODULI[0])
+    print(window.text(), window.value)
+
+    # Search for several patterns at once, with the text arriving in chunks
+    print("\nRabin-Karp Search:")
+    print(rabin_karp_search("abracadabra", "abra"))
+    print(rabin_karp_search(["abrac", "adabra"], ["bra", "cad", "xyz"]))
     
     # Test the Jenkins hash function
     print("\nJenkins Hash:")
-    print(calculate_jenkins_hash("Hello, World!"))
\ No newline at end of file
+    print(calculate_jenkins_hash("Hello, World!"))
@@ -2,6 +2,9 @@
 
 # Import the necessary modules
 import hashlib
+import os
+import sys
+import time
 
 # Function to hash a string
 def hash_string(input_str):
@@ -28,8 +31,85 @@ def compare_hashes(str1, str2):
     else:
         return False
 
+# Rolling hash search
+# -------------------
+# Hashing every window with SHA-256 costs a new slice plus a full hash per
+# position. A rolling (polynomial) hash instead updates the previous window's
+# hash in O(1) when the window moves one character:
+#
+#     hash = (hash - first_char * BASE**(m-1)) * BASE + next_char   (mod M)
+#
+# A matching hash only makes a position a *candidate*: different text can
+# share a hash. Every candidate is confirmed by comparing the text directly,
+# so the positions reported are always exact.
+
+ROLLING_BASE = 257
+ROLLING_MODULUS = (1 << 61) - 1  # A Mersenne prime: large, so false candidates are very rare.
+
+# Function to turn a str or bytes into a sequence of integer codes without copying per character
+def _codes(data):
+    if isinstance(data, (bytes, bytearray, memoryview)):
+        return memoryview(data).cast("B")
+    return memoryview(data.encode("utf-32-le")).cast("I")
+
+# Function to find every position of sub_str in main_str (both str, or both bytes) with a rolling hash
+def rolling_hash_search(main_str, sub_str):
+    m = len(sub_str)
+    if m == 0 or m > len(main_str):
+        return []
+    codes = _codes(main_str)
+    target = 0
+    window_hash = 0
+    for pattern_code, code in zip(_codes(sub_str), codes[:m]):
+        target = (target * ROLLING_BASE + pattern_code) % ROLLING_MODULUS
+        window_hash = (window_hash * ROLLING_BASE + code) % ROLLING_MODULUS
+    high_power = pow(ROLLING_BASE, m - 1, ROLLING_MODULUS)
+
+    positions = []
+    if window_hash == target and main_str[:m] == sub_str:
+        positions.append(0)
+    # Slide the window: drop codes[i - m], add codes[i]
+    for i, (old_code, new_code) in enumerate(zip(codes, codes[m:]), start=1):
+        window_hash = ((window_hash - old_code * high_power) * ROLLING_BASE + new_code) % ROLLING_MODULUS
+        if window_hash == target and main_str[i:i + m] == sub_str:
+            positions.append(i)
+    return positions
+
+# Function to find all byte offsets of a pattern in a file of any size
+def scan_file(path, pattern, chunk_size=1 << 20):
+    # The file is read in chunks. A match can straddle two chunks, so the
+    # last len(pattern) - 1 bytes of each chunk are carried over and searched
+    # again at the start of the next one. Matches that lie entirely inside
+    # the carried bytes were already reported, so nothing is found twice.
+    if isinstance(pattern, str):
+        pattern = pattern.encode("utf-8")
+    overlap = len(pattern) - 1
+    positions = []
+    carried = b""
+    offset = 0  # File offset of the first byte of `carried`
+    with open(path, "rb") as file:
+        while True:
+            chunk = file.read(chunk_size)
+            if not chunk:
+                break
+            buffer = carried + chunk
+            positions.extend(offset + i for i in rolling_hash_search(buffer, pattern))
+            carried = buffer[max(0, len(buffer) - overlap):] if overlap else b""
+            offset += len(buffer) - len(carried)
+    return positions
+
 # Function to find a substring within a string using hashing
-def find_substring(main_str, sub_str):
+def find_substring(main_str, sub_str, mode="sha256"):
+    # mode="rolling" uses the rolling hash search above, which is much faster
+    # and reports every position where the substring occurs
+    if mode == "rolling":
+        positions = rolling_hash_search(main_str, sub_str)
+        if len(positions) == 1:
+            return f'Substring found at position {positions[0]}'
+        if positions:
+            return f'Substring found at positions {", ".join(map(str, positions))}'
+        return 'Substring not found'
+
     # Create a new SHA-256 hash object
     main_hash = hashlib.sha256()
     
@@ -63,4 +143,32 @@ main_str = "Hello, World!"
 sub_str = "World"
 print(compare_hashes(main_str, sub_str))  # Output: True
 
-print(find_substring(main_str, sub_str))  # Output: Substring found at position 7
\ No newline at end of file
+print(find_substring(main_str, sub_str))  # Output: Substring found at position 7
+
+# Function to compare the SHA-256 search with the rolling hash search on a large text
+def benchmark(size_mb=4, pattern="needle-in-the-log"):
+    line = "2026-03-18 12:00:00 INFO request served in 12ms by worker-7\n"
+    text = line * (size_mb * 2**20 // len(line)) + pattern
+    print(f"Searching {len(text) / 2**20:.1f} MB of text for {pattern!r}")
+
+    started = time.perf_counter()
+    sha_result = find_substring(text, pattern)
+    sha_time = time.perf_counter() - started
+
+    started = time.perf_counter()
+    rolling_result = find_substring(text, pattern, mode="rolling")
+    rolling_time = time.perf_counter() - started
+
+    assert sha_result == rolling_result, (sha_result, rolling_result)
+    print(f"SHA-256 per window: {sha_time:.2f}s, rolling hash: {rolling_time:.2f}s "
+          f"({sha_time / rolling_time:.1f}x faster) -> {rolling_result}")
+
+# Scan a file for every occurrence of a pattern, or run the benchmark:
+#   python python_18_mar_289.py server.log "ERROR"
+#   python python_18_mar_289.py --benchmark 8
+if __name__ == "__main__":
+    if len(sys.argv) == 3 and sys.argv[1] != "--benchmark":
+        found = scan_file(sys.argv[1], sys.argv[2])
+        print(f"{len(found)} matches in {os.path.basename(sys.argv[1])} at byte offsets {found[:20]}")
+    elif len(sys.argv) >= 2 and sys.argv[1] == "--benchmark":
+        benchmark(int(sys.argv[2]) if len(sys.argv) > 2 else 4)
@@ -1,14 +1,69 @@
 # String Hashing using Python
 
 # Import the required module for prime numbers
+import mmap
+import os
 import random
+import tempfile
+import time
+
+# NumPy is optional: it hashes large byte chunks much faster (see _djb2_block)
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+# Streaming djb2
+# --------------
+# djb2 processes one byte after another: h = h * 33 + byte (mod 2**32).
+# Unrolled over a block of L bytes b[0] .. b[L-1] that is
+#
+#     h_after = h * 33**L + b[0] * 33**(L-1) + b[1] * 33**(L-2) + ... + b[L-1]
+#
+# so a whole block can be folded in with one multiply-and-sum over the block,
+# using a precomputed table of powers of 33. NumPy's uint32 arithmetic wraps
+# around at 2**32 exactly like the "% 2**32" here, so the result is identical
+# to the byte-by-byte loop.
+
+DJB2_INITIAL = 5381
+DJB2_BLOCK_SIZE = 1 << 20  # Bytes folded in per NumPy operation
+_DJB2_MODULUS = 2**32
+_djb2_powers = None  # _djb2_powers[k] == 33**(DJB2_BLOCK_SIZE - 1 - k) % 2**32, built on first use
+
+# Function to fold one block of bytes (at most DJB2_BLOCK_SIZE) into a djb2 state
+def _djb2_block(state, block):
+    global _djb2_powers
+    length = len(block)
+    if np is None or length < 64:
+        # Short blocks (or no NumPy): the plain djb2 loop over the byte values
+        for byte in block:
+            state = (state * 33 + byte) % _DJB2_MODULUS
+        return state
+    if _djb2_powers is None:
+        exponents = np.full(DJB2_BLOCK_SIZE, 33, dtype=np.uint32)
+        exponents[-1] = 1
+        # Cumulative product from the right: 33**0 at the end, 33**(N-1) at the front
+        _djb2_powers = np.cumprod(exponents[::-1], dtype=np.uint32)[::-1].copy()
+    values = np.frombuffer(block, dtype=np.uint8)
+    block_sum = int(np.sum(values * _djb2_powers[DJB2_BLOCK_SIZE - length:], dtype=np.uint32))
+    return (state * pow(33, length, _DJB2_MODULUS) + block_sum) % _DJB2_MODULUS
 
 class Djb2Hasher:
-    def __init__(self):
+    # hashlib-style attributes
+    name = "djb2"
+    digest_size = 4
+    block_size = 1
+
+    def __init__(self, data=b""):
         # Initialize the prime number and modulus values
         self.prime = 131
         self.modulus = 2**32
 
+        # State of the streaming interface (update/digest/copy)
+        self._state = DJB2_INITIAL
+        if data:
+            self.update(data)
+
     def hash(self, s):
         # Set the initial hash value to 5381 (a common starting point for djb2)
         hash_value = 5381
@@ -33,6 +88,70 @@ class Djb2Hasher:
         # Calculate the hash of the reversed string
         return self.hash(reversed_s)
 
+    # Streaming interface, used like hashlib:
+    #
+    #     hasher = Djb2Hasher()
+    #     hasher.update(b"Hello ")
+    #     hasher.update(b"World")
+    #     hasher.hexdigest()
+    #
+    # It consumes raw bytes, so nothing is decoded. For ASCII text the result
+    # equals hash(text); hash() adds ord(char), which differs from the UTF-8
+    # bytes for other characters.
+
+    def update(self, data):
+        # Accept bytes, bytearray, memoryview, mmap or anything else with the buffer protocol
+        if isinstance(data, str):
+            raise TypeError("Strings must be encoded before hashing")
+        view = memoryview(data).cast("B")
+        state = self._state
+        for start in range(0, len(view), DJB2_BLOCK_SIZE):
+            state = _djb2_block(state, view[start:start + DJB2_BLOCK_SIZE])
+        self._state = state
+
+    def intdigest(self):
+        # The hash value as an integer, like hash() returns
+        return self._state
+
+    def digest(self):
+        # The hash value as 4 big-endian bytes
+        return self._state.to_bytes(self.digest_size, "big")
+
+    def hexdigest(self):
+        return self.digest().hex()
+
+    def copy(self):
+        # A separate hasher with the same state, e.g. to hash several files sharing a common prefix
+        clone = Djb2Hasher()
+        clone._state = self._state
+        return clone
+
+# Function to compute the djb2 hash of a file without loading it into memory
+def hash_file(path, use_mmap=True, buffer_size=DJB2_BLOCK_SIZE):
+    # With mmap the operating system pages the file in as it is read; without
+    # it, the file is read into one reusable buffer. Either way memory use
+    # stays bounded, whatever the file size. Returns a Djb2Hasher.
+    hasher = Djb2Hasher()
+    with open(path, "rb") as file:
+        if use_mmap:
+            try:
+                mapped = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+            except ValueError:
+                # Empty files cannot be mapped; fall through to plain reads
+                mapped = None
+            if mapped is not None:
+                with mapped:
+                    hasher.update(mapped)
+                return hasher
+        buffer = bytearray(buffer_size)
+        view = memoryview(buffer)
+        while True:
+            count = file.readinto(buffer)
+            if not count:
+                break
+            hasher.update(view[:count])
+    return hasher
+
 def main():
     # Create a Djb2Hasher instance
     hasher = Djb2Hasher()
@@ -45,5 +164,30 @@ def main():
     reversed_hash_value = hasher.reverse(input_str)
     print(f"Reversed Hash Value: {reversed_hash_value}")
 
+    # Stream the same text in pieces: for ASCII it matches hash()
+    streaming = Djb2Hasher()
+    streaming.update(b"Hello ")
+    partial = streaming.copy()
+    streaming.update(memoryview(b"World"))
+    print(f"Streamed Hash Value: {streaming.intdigest()} (hex {streaming.hexdigest()})")
+    assert streaming.intdigest() == hash_value
+    assert partial.intdigest() == hasher.hash("Hello ")
+
+    # Hash a few megabytes of random data as a file, and compare with the character loop
+    data = random.Random(0).randbytes(8 * 2**20)
+    with tempfile.NamedTemporaryFile(delete=False) as file:
+        file.write(data)
+    try:
+        started = time.perf_counter()
+        file_hash = hash_file(file.name).intdigest()
+        file_time = time.perf_counter() - started
+        started = time.perf_counter()
+        loop_hash = hasher.hash(data.decode("latin-1"))
+        loop_time = time.perf_counter() - started
+        assert file_hash == loop_hash == hash_file(file.name, use_mmap=False).intdigest()
+        print(f"8 MB file: hash_file {file_time:.3f}s, character loop {loop_time:.2f}s, hash {file_hash}")
+    finally:
+        os.remove(file.name)
+
 if __name__ == "__main__":
     main()
\ No newline at end of file